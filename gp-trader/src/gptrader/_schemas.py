@@ -38,6 +38,7 @@ class OrderV1(BaseModel):
     type: Literal["market", "limit"] = "market"
     limit_price: float | None = None
     dry_run: bool = True
+    order_id: str = Field(default_factory=str)  # assigned by the executor
 
 
 class FillV1(BaseModel):
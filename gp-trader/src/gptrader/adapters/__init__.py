@@ -1,12 +1,16 @@
 from .eventbus import LocalEventBus
-from .exec import NoopExecutor
-from .factory import make_bus, make_executor, make_index
+from .exec import AsyncExecutor, Executor, NoopExecutor, OrderIds
+from .factory import executor_class, make_bus, make_executor, make_index
 from .index import LocalIndex
 
 __all__ = [
     "LocalEventBus",
+    "Executor",
+    "AsyncExecutor",
     "NoopExecutor",
+    "OrderIds",
     "LocalIndex",
+    "executor_class",
     "make_bus",
     "make_executor",
     "make_index",
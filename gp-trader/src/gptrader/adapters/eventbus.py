@@ -14,6 +14,8 @@ class LocalEventBus:
         self._b = LocalBus(base=base)
 
     def publish(self, topic: str, events: Iterable[Mapping[str, Any]]) -> None:
-        payload = list(events)
-        # LocalBus.publish(topic: str, key: str, payload: list[dict]) (runtime contract)
-        self._b.publish(topic=topic, key="", payload=payload)  # type: ignore[arg-type]
+        from gptrader.partitioning import event_key
+
+        # one journal line per event, keyed like the rest of the bus (keyless -> round-robin)
+        for ev in events:
+            self._b.publish(topic=topic, key=event_key(ev), payload=dict(ev))
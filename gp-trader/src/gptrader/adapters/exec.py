@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
+import itertools
+import uuid
+from collections.abc import Iterable, Mapping
 from typing import Any, Protocol
 
 
@@ -8,7 +10,30 @@ class Executor(Protocol):
     def place_order(self, order: Mapping[str, Any]) -> Mapping[str, Any]: ...
 
 
+class AsyncExecutor(Protocol):
+    """Batch-oriented executor: reports come back in the order the orders were given."""
+
+    async def place_orders(self, orders: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]: ...
+
+
+class OrderIds:
+    """Order ids unique across processes and runs: <prefix>-<session>-<seq>."""
+
+    def __init__(self, prefix: str) -> None:
+        self.prefix = f"{prefix}-{uuid.uuid4().hex[:8]}"
+        self._seq = itertools.count(1)  # next() is atomic under the GIL
+
+    def __call__(self) -> str:
+        return f"{self.prefix}-{next(self._seq):06d}"
+
+
 class NoopExecutor(Executor):
+    def __init__(self) -> None:
+        self._ids = OrderIds("noop")
+
     def place_order(self, order: Mapping[str, Any]) -> Mapping[str, Any]:
         # record-only / simulated execution
-        return {**order, "status": "simulated", "id": "noop-0"}
+        return {**order, "status": "simulated", "id": self._ids()}
+
+    async def place_orders(self, orders: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        return [dict(self.place_order(o)) for o in orders]
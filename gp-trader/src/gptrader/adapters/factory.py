@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 from gptrader.config import settings
@@ -10,6 +11,7 @@ from .index import LocalIndex
 
 if TYPE_CHECKING:
     from .eventhubs import EventHubsBus  # for type hints only
+    from .simvenue import SimulatedExecutor
 
 
 def make_bus() -> LocalEventBus | EventHubsBus:
@@ -25,5 +27,26 @@ def make_index() -> LocalIndex:
     return LocalIndex()
 
 
-def make_executor() -> NoopExecutor:
+def executor_class() -> type[NoopExecutor] | type[SimulatedExecutor]:
+    """The executor make_executor() builds, without building it (or its journal)."""
+    if settings.exec_backend == "sim":
+        from .simvenue import SimulatedExecutor  # lazy import
+
+        return SimulatedExecutor
+    return NoopExecutor
+
+
+def make_executor(base: Path | None = None) -> NoopExecutor | SimulatedExecutor:
+    """
+    The configured executor. The sim venue journals orders and fills under
+    `base`/data/journal, like `gptrader exec-sim`; `base` defaults to the parent
+    of settings.data_dir (the journal lives in the data dir, not below it).
+    """
+    if settings.exec_backend == "sim":
+        from gptrader.bus import LocalBus
+
+        from .simvenue import SimulatedExecutor  # lazy import
+
+        root = settings.data_dir.parent if base is None else base
+        return SimulatedExecutor(bus=LocalBus(base=root))
     return NoopExecutor()
@@ -0,0 +1,214 @@
+"""
+Simulated local venue for load-testing the strategy -> fill path without a broker.
+
+Orders are validated as OrderV1, get unique ids, and are published to
+orders.v1 (one append per batch). They then either get rejected or fill after a
+lognormal latency, optionally in several partial fills. Fills are published to
+fills.v1 as FillV1 once the batch completes. Outcomes are drawn when an order is
+submitted, so for a given seed they don't depend on task scheduling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+import numpy as np
+from pydantic import ValidationError
+
+from gptrader._schemas import FillV1, OrderV1
+from gptrader.batch import EventBatch
+from gptrader.bus import LocalBus
+from gptrader.metrics import REGISTRY
+
+from .exec import OrderIds
+
+MAX_SLICES = 4
+
+
+@dataclass
+class VenueSpec:
+    latency_ms: float = 2.0  # median latency per fill slice
+    latency_sigma: float = 0.5  # lognormal shape; 0 = constant latency
+    reject_rate: float = 0.01
+    partial_rate: float = 0.2  # share of orders filled in 2..MAX_SLICES partial fills
+    slippage_bps: float = 1.0  # stddev of market fill prices around the mark
+    seed: int = 42
+    marks: dict[str, float] = field(default_factory=dict)  # reference prices; default 100
+
+
+@dataclass
+class _Plan:
+    report: dict[str, Any]
+    order: OrderV1 | None  # None when the order failed validation
+    delays: list[float]  # seconds before each fill slice
+    qtys: list[float]
+    prices: list[float]
+    reject_after: float = 0.0  # > 0 for orders the venue rejects
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+class SimulatedExecutor:
+    """AsyncExecutor over a simulated venue, with at most `max_in_flight` open orders."""
+
+    def __init__(
+        self,
+        bus: LocalBus | None = None,
+        spec: VenueSpec | None = None,
+        *,
+        run_id: str = "sim",
+        max_in_flight: int = 64,
+    ) -> None:
+        self.bus = bus
+        self.spec = spec or VenueSpec()
+        self.run_id = run_id
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._ids = OrderIds("sim")
+        self._rng = np.random.default_rng(self.spec.seed)
+        self._sem: asyncio.Semaphore | None = None
+        self._sem_loop: asyncio.AbstractEventLoop | None = None
+
+    def place_order(self, order: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Synchronous Executor shim; not usable from inside a running event loop."""
+        return asyncio.run(self.place_orders([order]))[0]
+
+    async def place_orders(self, orders: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        t0 = time.perf_counter()
+        plans = self._plan(list(orders))
+        models = [p.order for p in plans if p.order is not None]
+        if self.bus is not None and models:
+            self.bus.publish_batch("orders.v1", EventBatch.from_models(models))
+
+        sem = self._semaphore()
+        fills = await asyncio.gather(*(self._execute(p, sem, t0) for p in plans))
+        rows = [f for fs in fills for f in fs]
+        if self.bus is not None and rows:
+            self.bus.publish_batch("fills.v1", EventBatch.from_rows(FillV1, rows, trusted=True))
+        REGISTRY.inc("exec_fills_total", len(rows))
+        return [p.report for p in plans]
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem, self._sem_loop = asyncio.Semaphore(self.max_in_flight), loop
+        return self._sem
+
+    def _plan(self, orders: Sequence[Mapping[str, Any]]) -> list[_Plan]:
+        """Validate, assign ids and draw every random outcome for a batch up front."""
+        s, n = self.spec, len(orders)
+        rng = self._rng
+        reject = rng.random(n) < s.reject_rate
+        slices = np.where(rng.random(n) < s.partial_rate, rng.integers(2, MAX_SLICES + 1, n), 1)
+        mu = math.log(max(s.latency_ms, 1e-9) / 1e3)
+        delays = rng.lognormal(mu, s.latency_sigma, (n, MAX_SLICES))
+        weights = rng.random((n, MAX_SLICES)) + 0.1
+        slip = np.abs(rng.normal(0.0, s.slippage_bps / 1e4, (n, MAX_SLICES)))
+
+        plans: list[_Plan] = []
+        now = _now()
+        for i, o in enumerate(orders):
+            oid = self._ids()
+            report: dict[str, Any] = {
+                **o,
+                "id": oid,
+                "status": "rejected",
+                "reason": "",
+                "filled_qty": 0.0,
+                "avg_price": None,
+                "fills": 0,
+                "latency_s": 0.0,
+            }
+            try:
+                order = OrderV1.model_validate(
+                    {"run_id": self.run_id, "ts": now, **o, "order_id": oid}
+                )
+            except ValidationError as e:
+                report["reason"] = f"invalid order: {e.error_count()} error(s)"
+                plans.append(_Plan(report, None, [], [], []))
+                continue
+            if order.qty <= 0 or (order.type == "limit" and order.limit_price is None):
+                report["reason"] = "qty must be > 0 and limit orders need limit_price"
+            elif reject[i]:
+                report["reason"] = "rejected by venue"
+            if report["reason"]:
+                plans.append(_Plan(report, order, [], [], [], reject_after=float(delays[i, 0])))
+                continue
+
+            k = int(slices[i])
+            w = weights[i, :k] / weights[i, :k].sum()
+            qtys = (order.qty * w).tolist()
+            qtys[-1] = order.qty - sum(qtys[:-1])
+            if order.type == "limit":
+                assert order.limit_price is not None
+                prices = [order.limit_price] * k
+            else:
+                sign = 1.0 if order.side == "buy" else -1.0
+                mark = s.marks.get(order.symbol, 100.0)
+                prices = (mark * (1.0 + sign * slip[i, :k])).tolist()
+            plans.append(_Plan(report, order, delays[i, :k].tolist(), qtys, prices))
+        return plans
+
+    async def _execute(
+        self, plan: _Plan, sem: asyncio.Semaphore, submitted: float
+    ) -> list[dict[str, Any]]:
+        """Wait for the plan's fills; latency_s runs from submission, so it includes queueing."""
+        r, order = plan.report, plan.order
+        if order is None:
+            REGISTRY.inc("exec_orders_total", status="rejected")
+            return []
+        fills: list[dict[str, Any]] = []
+        async with sem:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            REGISTRY.set("exec_in_flight", self.in_flight)
+            try:
+                if plan.reject_after:  # venue reject comes back after one round trip
+                    await asyncio.sleep(plan.reject_after)
+                for delay, qty, price in zip(plan.delays, plan.qtys, plan.prices, strict=True):
+                    await asyncio.sleep(delay)
+                    fills.append(
+                        {
+                            "run_id": order.run_id,
+                            "ts": _now(),
+                            "order_id": order.order_id,
+                            "symbol": order.symbol,
+                            "side": order.side,
+                            "qty": qty,
+                            "price": price,
+                        }
+                    )
+            finally:
+                self.in_flight -= 1
+            r["latency_s"] = time.perf_counter() - submitted
+        if fills:
+            r["status"] = "filled"
+            r["fills"] = len(fills)
+            r["filled_qty"] = order.qty
+            r["avg_price"] = sum(f["qty"] * f["price"] for f in fills) / order.qty
+        REGISTRY.inc("exec_orders_total", status=r["status"])
+        if REGISTRY.enabled:
+            REGISTRY.histogram("exec_order_latency_seconds").observe(r["latency_s"])
+        return fills
+
+
+async def run_load(
+    executor: SimulatedExecutor, orders: Sequence[Mapping[str, Any]], batch_size: int = 100
+) -> tuple[list[dict[str, Any]], float]:
+    """
+    Submit `orders` as concurrent place_orders batches (pipelined: a batch does not
+    wait for the previous one). Returns the reports in order and the wall time.
+    """
+    t0 = time.perf_counter()
+    chunks = [orders[i : i + batch_size] for i in range(0, len(orders), batch_size)]
+    done = await asyncio.gather(*(executor.place_orders(c) for c in chunks))
+    return [r for chunk in done for r in chunk], time.perf_counter() - t0
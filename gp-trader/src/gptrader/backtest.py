@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from gptrader.batch import EventBatch
+from gptrader.bus import LocalBus
+from gptrader.metrics import REGISTRY
+from gptrader.timeindex import event_micros, ts_micros
+
+
+def sma(prices: np.ndarray, n: int) -> np.ndarray:
+    """
+    Trailing simple moving average; NaN until n values are available.
+
+    Each window is summed left to right like sum(vals[-n:]), not via a cumsum
+    difference: with cent prices SMA ties are common and must compare the same.
+    """
+    out = np.full(len(prices), np.nan)
+    if len(prices) >= n:
+        w = np.lib.stride_tricks.sliding_window_view(prices, n)
+        s = w[:, 0].copy()
+        for j in range(1, n):
+            s += w[:, j]
+        out[n - 1 :] = s / n
+    return out
+
+
+@dataclass
+class BacktestResult:
+    ts: np.ndarray
+    equity: np.ndarray
+    orders: int
+
+    @property
+    def final_eq(self) -> float:
+        return float(self.equity[-1]) if len(self.equity) else 0.0
+
+
+def sma_crossover(
+    ts: np.ndarray, prices: np.ndarray, fast: int = 5, slow: int = 20
+) -> BacktestResult:
+    """Long when SMA(fast) > SMA(slow), flat otherwise; mark-to-market each bar."""
+    long = sma(prices, fast) > sma(prices, slow)  # NaN compares False -> flat
+    pos = long.astype(np.float64)
+    orders = int(np.count_nonzero(np.diff(np.insert(long, 0, False))))
+    pnl = np.zeros(len(prices))
+    pnl[1:] = np.diff(prices) * pos[1:]
+    return BacktestResult(ts=ts, equity=np.cumsum(pnl), orders=orders)
+
+
+def run_sma_backtest(
+    batches: Iterable[EventBatch],
+    symbol: str,
+    *,
+    in_order: bool = True,
+    since: str | None = None,
+) -> BacktestResult:
+    """
+    Run the crossover over quote batches for one symbol, in batch order, or in
+    ts order (stable) when `in_order` is False, e.g. batches read from several
+    partitions of a topic that does not keep a symbol in one partition.
+    Bars before `since` are dropped: a time seek can land on some of them when
+    a partition is not time-ordered.
+    """
+    t0 = time.perf_counter()
+    parts = [b.where_symbol(symbol) for b in batches]
+    parts = [b for b in parts if len(b)]
+    if parts:
+        ts = np.concatenate([b.columns["ts"] for b in parts])
+        prices = np.concatenate([b.columns["price"] for b in parts])
+    else:
+        ts, prices = np.array([], dtype=object), np.array([], dtype=np.float64)
+    if since is not None or not in_order:
+        micros = np.fromiter(map(event_micros, ts), np.int64, len(ts))
+        if since is not None:
+            keep = micros >= ts_micros(since)
+            ts, prices, micros = ts[keep], prices[keep], micros[keep]
+        if not in_order:
+            order = np.argsort(micros, kind="stable")
+            ts, prices = ts[order], prices[order]
+    res = sma_crossover(ts, prices)
+    dt = time.perf_counter() - t0
+    REGISTRY.inc("backtest_bars_total", len(prices))
+    if REGISTRY.enabled:
+        REGISTRY.histogram("backtest_seconds").observe(dt)
+    if dt > 0:
+        REGISTRY.set("backtest_bars_per_second", len(prices) / dt)
+    return res
+
+
+def backtest_to_artifacts(
+    bus: LocalBus, art: Path, run_id: str, symbol: str, since: str | None = None
+) -> dict[str, Any]:
+    """
+    Backtest `symbol` from the quotes journal (from `since` on, found via the time
+    index); write pnl.csv and summary.json under art.
+    """
+    # Only the symbol's partition is read (when keys stick to one), as columnar batches
+    keyed = bus.topic_partitioner("quotes.v1").keyed
+    parts = [bus.partition_for(symbol, "quotes.v1")] if keyed else None
+    envs = bus.read_batches("quotes.v1", partitions=parts, from_ts=since)
+    res = run_sma_backtest((e.batch for e in envs), symbol, in_order=keyed, since=since)
+
+    art.mkdir(parents=True, exist_ok=True)
+    with open(art / "pnl.csv", "w") as w:
+        w.write("ts,eq\n")
+        w.writelines(f"{ts},{v}\n" for ts, v in zip(res.ts, res.equity.tolist(), strict=True))
+
+    summary: dict[str, Any] = {
+        "run_id": run_id,
+        "symbol": symbol,
+        "orders": res.orders,
+        "final_eq": res.final_eq,
+    }
+    if since:
+        summary["since"] = since
+    (art / "summary.json").write_text(json.dumps(summary, indent=2))
+    return summary
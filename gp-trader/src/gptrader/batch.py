@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from functools import cache
+from typing import Any, Literal, get_args, get_origin
+
+import numpy as np
+from pydantic import BaseModel
+
+from gptrader.codec import validate_column
+
+_DTYPES: dict[Any, Any] = {float: np.float64, int: np.int64, bool: np.bool_}
+
+
+@cache
+def _layout(schema: type[BaseModel]) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Split schema fields into constant columns (single-valued Literal, e.g. v/topic)
+    and stored columns -> NumPy dtype (object for strings/optionals).
+    """
+    consts: dict[str, Any] = {}
+    stored: dict[str, Any] = {}
+    for name, f in schema.model_fields.items():
+        ann = f.annotation
+        if get_origin(ann) is Literal and len(get_args(ann)) == 1:
+            consts[name] = get_args(ann)[0]
+            continue
+        stored[name] = _DTYPES.get(ann, object)
+    return consts, stored
+
+
+def _object_array(values: Sequence[Any]) -> np.ndarray:
+    out = np.empty(len(values), dtype=object)
+    out[:] = values
+    return out
+
+
+@dataclass
+class EventBatch:
+    """
+    Columnar events of one schema: one NumPy array per field.
+
+    `symbol` is dictionary-encoded (`symbols[symbol_codes]`), constant Literal
+    fields such as `v`/`topic` are not stored per row.
+    """
+
+    schema: type[BaseModel]
+    columns: dict[str, np.ndarray]
+    symbols: np.ndarray
+    symbol_codes: np.ndarray
+
+    # ---------------- Construction ----------------
+
+    @classmethod
+    def from_columns(
+        cls,
+        schema: type[BaseModel],
+        columns: Mapping[str, Any],
+        *,
+        trusted: bool = False,
+    ) -> EventBatch:
+        """Build from per-field arrays; validated column-at-a-time unless trusted."""
+        _, stored = _layout(schema)
+        n = len(columns["symbol"]) if "symbol" in columns else 0
+        cols: dict[str, np.ndarray] = {}
+        for name, dtype in stored.items():
+            f = schema.model_fields[name]
+            if name in columns:
+                values = columns[name]
+            elif f.is_required():
+                raise ValueError(f"{schema.__name__}: missing column {name!r}")
+            else:
+                values = [f.get_default(call_default_factory=True)] * n
+            if trusted:
+                arr = np.asarray(values, dtype=dtype) if dtype is not object else None
+                cols[name] = arr if arr is not None else _object_array(list(values))
+            else:
+                cols[name] = validate_column(name, f.annotation, values)
+            if len(cols[name]) != n:
+                raise ValueError(f"{schema.__name__}: column {name!r} has length {len(cols[name])}")
+        symbols, codes = np.unique(cols.pop("symbol").astype(str), return_inverse=True)
+        return cls(schema, cols, _object_array(symbols.tolist()), codes.astype(np.int32))
+
+    @classmethod
+    def from_rows(
+        cls, schema: type[BaseModel], rows: Sequence[Mapping[str, Any]], *, trusted: bool = False
+    ) -> EventBatch:
+        _, stored = _layout(schema)
+        columns: dict[str, list[Any]] = {}
+        for name in stored:
+            f = schema.model_fields[name]
+            if f.is_required():
+                columns[name] = [r[name] for r in rows]
+            else:
+                default = f.get_default(call_default_factory=True)
+                columns[name] = [r.get(name, default) for r in rows]
+        return cls.from_columns(schema, columns, trusted=trusted)
+
+    @classmethod
+    def from_models(cls, events: Sequence[BaseModel]) -> EventBatch:
+        if not events:
+            raise ValueError("from_models needs at least one event")
+        schema = type(events[0])
+        rows = [e.__dict__ for e in events]
+        return cls.from_rows(schema, rows, trusted=True)
+
+    @classmethod
+    def concat(cls, batches: Sequence[EventBatch]) -> EventBatch:
+        if not batches:
+            raise ValueError("concat needs at least one batch")
+        first = batches[0]
+        symbols = np.concatenate([b.symbol() for b in batches])
+        uniq, codes = np.unique(symbols.astype(str), return_inverse=True)
+        cols = {k: np.concatenate([b.columns[k] for b in batches]) for k in first.columns}
+        return cls(first.schema, cols, _object_array(uniq.tolist()), codes.astype(np.int32))
+
+    # ---------------- Access ----------------
+
+    @property
+    def topic(self) -> str:
+        return str(_layout(self.schema)[0]["topic"])
+
+    def __len__(self) -> int:
+        return len(self.symbol_codes)
+
+    def symbol(self) -> np.ndarray:
+        """Decoded symbol column."""
+        return self.symbols[self.symbol_codes]
+
+    def take(self, index: np.ndarray) -> EventBatch:
+        """Row selection by boolean mask or integer index; keeps the dictionary."""
+        cols = {k: v[index] for k, v in self.columns.items()}
+        return EventBatch(self.schema, cols, self.symbols, self.symbol_codes[index])
+
+    def where_symbol(self, symbol: str) -> EventBatch:
+        hits = np.flatnonzero(self.symbols == symbol)
+        if hits.size == 0:
+            return self.take(np.zeros(len(self), dtype=bool))
+        return self.take(self.symbol_codes == hits[0])
+
+    def to_columns(self) -> dict[str, np.ndarray]:
+        """Decoded columns in schema field order (constants excluded)."""
+        _, stored = _layout(self.schema)
+        return {k: self.symbol() if k == "symbol" else self.columns[k] for k in stored}
+
+    def to_rows(self) -> list[dict[str, Any]]:
+        consts, stored = _layout(self.schema)
+        cols = self.to_columns()
+        names = list(self.schema.model_fields)
+        series = [[consts[k]] * len(self) if k in consts else cols[k].tolist() for k in names]
+        return [dict(zip(names, row, strict=True)) for row in zip(*series, strict=True)]
+
+    def to_ndjson(self) -> bytes:
+        """
+        Encode as NDJSON without building per-row dicts: every column is
+        JSON-encoded once as a whole, then rows are stitched with a template.
+        """
+        consts, stored = _layout(self.schema)
+        parts: list[str] = []
+        series: list[Iterable[str]] = []
+        for k in self.schema.model_fields:
+            key = json.dumps(k)
+            if k in consts:
+                parts.append(f"{key}:{json.dumps(consts[k])}".replace("%", "%%"))
+                continue
+            parts.append(f"{key}:%s")
+            series.append(self._encoded(k, stored[k]))
+        template = "{" + ",".join(parts) + "}\n"
+        return "".join(template % row for row in zip(*series, strict=True)).encode()
+
+    def _encoded(self, name: str, dtype: Any) -> Iterable[str]:
+        if name == "symbol":
+            enc = [json.dumps(s) for s in self.symbols.tolist()]
+            return [enc[c] for c in self.symbol_codes.tolist()]
+        col = self.columns[name]
+        values = col.tolist()
+        if dtype is np.float64 and np.all(np.isfinite(col)):
+            return map(float.__repr__, values)
+        if dtype is np.int64:
+            return map(int.__repr__, values)
+        return map(json.dumps, values)
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from gptrader._schemas import QuoteV1
+from gptrader.adapters.simvenue import SimulatedExecutor, VenueSpec, run_load
+from gptrader.backtest import run_sma_backtest
+from gptrader.batch import EventBatch
+from gptrader.bus import LocalBus
+from gptrader.codec import SCHEMAS, dumps_ndjson, validate_batch
+from gptrader.daemon import BackgroundDaemon
+from gptrader.rpc import Client
+from gptrader.storage import materialize_ndjson_to_parquet, write_batch_parquet
+from gptrader.synth import MarketSpec, iter_market, universe
+from gptrader.vectorstore import Doc, LocalHybridIndex
+
+# Base event count per workload size; each workload scales its own work from it.
+SIZES = {"small": 10_000, "medium": 100_000, "large": 1_000_000}
+
+START = datetime(2025, 1, 2, 14, 30, tzinfo=UTC)
+
+
+def _sample_row(topic: str, i: int) -> dict[str, Any]:
+    base: dict[str, Any] = {"symbol": "AAPL", "ts": f"2025-01-01T00:00:{i % 60:02d}+00:00"}
+    if topic == "quotes.v1":
+        return {**base, "price": 100.0 + i * 0.01, "volume": 1000 + i, "partition_key": "AAPL"}
+    if topic == "news.v1":
+        return {**base, "headline": f"headline {i}", "partition_key": "AAPL"}
+    if topic == "orders.v1":
+        return {**base, "run_id": "bench", "side": "buy", "qty": 1.0}
+    fill = {"run_id": "bench", "order_id": f"o-{i}", "side": "buy", "qty": 1.0, "price": 1.0}
+    return {**base, **fill}
+
+
+def _eps(fn: Callable[[], Any], n: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    return n / dt if dt > 0 else float("inf")
+
+
+def bench_codec(n: int = 100_000) -> dict[str, dict[str, float]]:
+    """Events/second per schema for validated, trusted and serialize paths."""
+    out: dict[str, dict[str, float]] = {}
+    for topic, schema in SCHEMAS.items():
+        rows = [_sample_row(topic, i) for i in range(n)]
+        events = validate_batch(schema, rows)
+        out[schema.__name__] = {
+            "validate_eps": _eps(lambda s=schema, r=rows: validate_batch(s, r), n),  # type: ignore[misc]
+            "trusted_eps": _eps(
+                lambda s=schema, r=rows: validate_batch(s, r, trusted=True), n  # type: ignore[misc]
+            ),
+            "dump_json_eps": _eps(lambda e=events: dumps_ndjson(e), n),  # type: ignore[misc]
+            "legacy_eps": _eps(
+                lambda s=schema, r=rows: [json.dumps(s(**x).model_dump()) for x in r],  # type: ignore[misc]
+                n,
+            ),
+        }
+    return out
+
+
+# ---------------- Workloads ----------------
+
+# setup(workdir, n) -> (timed callable, operations per call)
+Setup = Callable[[Path, int], tuple[Callable[[], Any], int]]
+
+# Cleanups registered by setups (e.g. stopping a daemon); run_workload drains it.
+_TEARDOWN: list[Callable[[], None]] = []
+
+
+def _quotes(n: int, symbols: int = 8) -> EventBatch:
+    spec = MarketSpec(symbols=universe(symbols), bars=max(1, n // symbols), start=START)
+    return EventBatch.concat([c.quotes for c in iter_market(spec, news=False)])
+
+
+def _bus_publish(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    bus = LocalBus(base, partitions=4)
+    rows = _quotes(n // 10).to_rows()
+    return lambda: [bus.publish("quotes.v1", key=r["symbol"], payload=r) for r in rows], len(rows)
+
+
+def _bus_publish_batch(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    bus = LocalBus(base, partitions=4)
+    batch = _quotes(n)
+    return lambda: bus.publish_batch("quotes.v1", batch), len(batch)
+
+
+def _bus_read_batches(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    bus = LocalBus(base, partitions=4)
+    batch = _quotes(n)
+    bus.publish_batch("quotes.v1", batch)
+    return lambda: sum(len(e.batch) for e in bus.read_batches("quotes.v1")), len(batch)
+
+
+_WORDS = ["apple", "guidance", "demand", "downgrade", "earnings", "outlook", "surge", "probe"]
+_QUERIES = [f"{_WORDS[i % len(_WORDS)]} {_WORDS[(i * 3) % len(_WORDS)]}" for i in range(20)]
+
+
+def _news_index(path: Path, docs: int) -> LocalHybridIndex:
+    idx = LocalHybridIndex(path)
+    for i in range(max(1, docs)):
+        text = " ".join(_WORDS[(i + j) % len(_WORDS)] for j in range(5)) + f" doc{i}"
+        idx.add(Doc(id=str(i), text=text, meta={}))
+    return idx
+
+
+def _index_search(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    idx = _news_index(base / "idx", n // 10)
+    return lambda: [idx.search(q, k=5) for q in _QUERIES], len(_QUERIES)
+
+
+def _search_cold(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    """Per-query cost of `gptrader search` without a daemon, minus interpreter startup."""
+    path = base / "data/indices/news"
+    _news_index(path, n // 100).persist()
+
+    def run() -> None:
+        for q in _QUERIES:
+            idx = LocalHybridIndex(path)
+            idx.load()
+            idx.search(q, k=5)
+
+    return run, len(_QUERIES)
+
+
+def _daemon(base: Path, n: int) -> Client:
+    _news_index(base / "data/indices/news", n // 100).persist()
+    d = BackgroundDaemon(base).start()
+    client = Client(d.path)
+    _TEARDOWN.extend([d.stop, client.close])
+    return client
+
+
+def _search_daemon(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    """Same queries as search_cold, answered by a warm `gptrader serve` over its socket."""
+    client = _daemon(base, n)
+    return lambda: [client.call("search", query=q, k=5) for q in _QUERIES], len(_QUERIES)
+
+
+def _daemon_roundtrip(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    """Bare request/response latency (ping) through the daemon socket."""
+    client = _daemon(base, 0)
+    return lambda: [client.call("ping") for _ in range(100)], 100
+
+
+def _storage_materialize(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    ndjson = base / "quotes.ndjson"
+    batch = _quotes(n)
+    ndjson.write_bytes(batch.to_ndjson())
+    return lambda: materialize_ndjson_to_parquet(ndjson, base / "q.parquet"), len(batch)
+
+
+def _storage_write_batch(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    batch = _quotes(n)
+    return lambda: write_batch_parquet(batch, base / "q.parquet"), len(batch)
+
+
+def _backtest(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    batch = _quotes(n, symbols=1)
+    return lambda: run_sma_backtest([batch], batch.symbols[0]), len(batch)
+
+
+def _codec_validate(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    rows = [_sample_row("quotes.v1", i) for i in range(n // 10)]
+    return lambda: validate_batch(QuoteV1, rows), len(rows)
+
+
+def _synth(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    spec = MarketSpec(symbols=universe(100), bars=max(1, n // 100), start=START, model="jump")
+    return lambda: sum(len(c.quotes) for c in iter_market(spec)), spec.bars * 100
+
+
+def _exec_sim(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    """Pipelined place_orders batches against the simulated venue (0.5ms median latency)."""
+    ex = SimulatedExecutor(
+        LocalBus(base, partitions=4), VenueSpec(latency_ms=0.5), max_in_flight=256
+    )
+    book = [{"symbol": "AAPL", "side": "buy", "qty": 1.0} for _ in range(n // 10)]
+    return lambda: asyncio.run(run_load(ex, book, batch_size=100)), len(book)
+
+
+def _cli_startup(base: Path, n: int) -> tuple[Callable[[], Any], int]:
+    """Cold `gptrader version` in a fresh interpreter (what schedulers pay per call)."""
+    cmd = [sys.executable, "-m", "gptrader.cli", "version"]
+    return lambda: subprocess.run(cmd, check=True, capture_output=True), 1
+
+
+WORKLOADS: dict[str, Setup] = {
+    "bus_publish": _bus_publish,
+    "bus_publish_batch": _bus_publish_batch,
+    "bus_read_batches": _bus_read_batches,
+    "index_search": _index_search,
+    "search_cold": _search_cold,
+    "search_daemon": _search_daemon,
+    "daemon_roundtrip": _daemon_roundtrip,
+    "storage_materialize": _storage_materialize,
+    "storage_write_batch": _storage_write_batch,
+    "backtest": _backtest,
+    "codec_validate": _codec_validate,
+    "synth": _synth,
+    "exec_sim": _exec_sim,
+    "cli_startup": _cli_startup,
+}
+
+
+# ---------------- Runner ----------------
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+@dataclass
+class BenchResult:
+    name: str
+    ops: int
+    times_s: list[float]
+    peak_rss_mb: float
+
+    def summary(self) -> dict[str, Any]:
+        t = np.asarray(self.times_s)
+        p50, p90, p99 = np.percentile(t, [50, 90, 99]).tolist()
+        return {
+            "ops": self.ops,
+            "repeat": len(self.times_s),
+            "times_s": self.times_s,
+            "min_s": float(t.min()),
+            "mean_s": float(t.mean()),
+            "p50_s": p50,
+            "p90_s": p90,
+            "p99_s": p99,
+            "ops_per_s": self.ops / p50 if p50 > 0 else float("inf"),
+            "peak_rss_mb": self.peak_rss_mb,
+        }
+
+
+def run_workload(name: str, n: int, *, repeat: int = 5, warmup: int = 1) -> BenchResult:
+    """Time one workload: setup once, warmup runs untimed, then `repeat` timed runs."""
+    times: list[float] = []
+    with tempfile.TemporaryDirectory(prefix=f"gptrader-bench-{name}-") as d:
+        try:
+            fn, ops = WORKLOADS[name](Path(d), n)
+            for _ in range(warmup):
+                fn()
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - t0)
+        finally:
+            while _TEARDOWN:
+                _TEARDOWN.pop()()
+    return BenchResult(name, ops, times, _peak_rss_mb())
+
+
+def _run_isolated(args: tuple[str, int, int, int]) -> dict[str, Any]:
+    name, n, repeat, warmup = args
+    return run_workload(name, n, repeat=repeat, warmup=warmup).summary()
+
+
+def run_suite(
+    *,
+    size: str = "small",
+    only: list[str] | None = None,
+    repeat: int = 5,
+    warmup: int = 1,
+    isolate: bool = False,
+) -> dict[str, Any]:
+    """
+    Run the selected workloads and return a JSON-serializable report.
+
+    peak_rss_mb is the process high-water mark; with isolate=True each workload
+    runs in a fresh interpreter so the figure is per workload.
+    """
+    n = SIZES[size]
+    names = only or list(WORKLOADS)
+    unknown = sorted(set(names) - set(WORKLOADS))
+    if unknown:
+        raise ValueError(f"unknown workloads: {unknown}")
+    if repeat < 1:
+        raise ValueError("repeat must be >= 1")
+    results: dict[str, Any] = {}
+    if isolate:
+        import multiprocessing as mp
+
+        with mp.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+            out = pool.map(_run_isolated, [(nm, n, repeat, warmup) for nm in names], chunksize=1)
+        results = dict(zip(names, out, strict=True))
+    else:
+        for nm in names:
+            results[nm] = run_workload(nm, n, repeat=repeat, warmup=warmup).summary()
+    return {
+        "meta": {
+            "size": size,
+            "n": n,
+            "repeat": repeat,
+            "warmup": warmup,
+            "isolate": isolate,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(UTC).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.2
+) -> dict[str, dict[str, Any]]:
+    """
+    Compare median times per workload. A workload regresses when its p50 grew by
+    more than `threshold` (0.2 = 20%) relative to the baseline.
+    """
+    out: dict[str, dict[str, Any]] = {}
+    base = baseline.get("results", {})
+    for name, cur in current.get("results", {}).items():
+        if name not in base:
+            continue
+        b, c = base[name]["p50_s"], cur["p50_s"]
+        change = c / b - 1.0 if b > 0 else 0.0
+        out[name] = {
+            "baseline_p50_s": b,
+            "p50_s": c,
+            "change": change,
+            "regressed": change > threshold,
+        }
+    return out
+
+
+if __name__ == "__main__":
+    print(json.dumps(bench_codec(), indent=2))
@@ -1,14 +1,36 @@
 # src/gptrader/bus.py
 from __future__ import annotations
 
-import hashlib
 import json
+import os
+import shutil
 import threading
-from collections.abc import Iterator
+from collections.abc import Iterator, Sequence
+from contextlib import ExitStack
 from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from gptrader.batch import EventBatch
+from gptrader.codec import SCHEMAS
+from gptrader.metrics import REGISTRY
+from gptrader.partitioning import (
+    Partitioner,
+    Sha256Partitioner,
+    default_partitioner,
+    event_key,
+    from_spec,
+)
+from gptrader.timeindex import TimeIndex
+
+# Per-topic layout, written on a topic's first publish and by repartition():
+# {"partitions": int, "partitioner": str, ...Partitioner.spec()}
+TOPIC_META = "topic.json"
+
 
 @dataclass
 class Envelope:
@@ -17,6 +39,24 @@ class Envelope:
     offset: int
     payload: dict[str, Any]
 
+    @property
+    def next_offset(self) -> int:
+        return self.offset + 1
+
+
+@dataclass
+class BatchEnvelope:
+    """A contiguous run of events [offset, offset + len(batch)) from one partition."""
+
+    topic: str
+    partition: int
+    offset: int
+    batch: EventBatch
+
+    @property
+    def next_offset(self) -> int:
+        return self.offset + len(self.batch)
+
 
 class LocalBus:
     """
@@ -24,13 +64,23 @@ class LocalBus:
 
     Journal layout:
       data/journal/<topic>/partition-<p>.ndjson
+      data/journal/<topic>/partition-<p>.tsidx -> sparse ts -> offset index (timeindex.py)
+      data/journal/<topic>/topic.json -> partition count and partitioner of the topic
       .runtime/offsets/<group>/<topic>-<p>.json -> {"offset": int}
     """
 
-    def __init__(self, base: Path, partitions: int = 4) -> None:
+    def __init__(
+        self, base: Path, partitions: int = 4, partitioner: Partitioner | None = None
+    ) -> None:
         self.base = base
         self.partitions = partitions
+        # partitions/partitioner only apply to topics that have no topic.json yet
+        self.partitioner = partitioner or default_partitioner()
+        self._layouts: dict[str, tuple[int, Partitioner]] = {}
         self.lock = threading.Lock()
+        # journal file -> (size in bytes, line count) so appends don't rescan the file
+        self._counts: dict[Path, tuple[int, int]] = {}
+        self._tindex: dict[Path, TimeIndex] = {}
         (self.base / "data/journal").mkdir(parents=True, exist_ok=True)
         (self.base / ".runtime/offsets").mkdir(parents=True, exist_ok=True)
 
@@ -44,52 +94,389 @@ class LocalBus:
         d.mkdir(parents=True, exist_ok=True)
         return d / f"{topic}-{partition}.json"
 
-    def _choose_partition(self, key: str) -> int:
-        h = hashlib.sha256(key.encode()).digest()
-        return int.from_bytes(h[:2], "big") % self.partitions
+    def _layout(self, topic: str, stamp: bool = False) -> tuple[int, Partitioner]:
+        """
+        (partition count, partitioner) of a topic, from its topic.json. Journals
+        written before topic.json existed were placed by SHA-256; topics with no
+        events yet get the bus defaults, recorded in topic.json when `stamp` is set
+        (on publish) so that later writers keep the same key placement.
+        """
+        layout = self._layouts.get(topic)
+        if layout is not None:
+            return layout
+        d = self.base / "data/journal" / topic
+        meta = d / TOPIC_META
+        if meta.exists():
+            spec = json.loads(meta.read_text())
+            layout = (spec["partitions"], from_spec(spec))
+        elif any(d.glob("partition-*.ndjson")):
+            layout = (self.partitions, Sha256Partitioner())
+        elif not stamp:
+            return self.partitions, self.partitioner
+        else:
+            layout = (self.partitions, self.partitioner)
+        if stamp and not meta.exists():
+            meta.parent.mkdir(parents=True, exist_ok=True)
+            meta.write_text(json.dumps({"partitions": layout[0], **layout[1].spec()}))
+        self._layouts[topic] = layout
+        return layout
+
+    def topic_partitions(self, topic: str) -> int:
+        """Partition count of a topic (see _layout)."""
+        return self._layout(topic)[0]
+
+    def topic_partitioner(self, topic: str) -> Partitioner:
+        """Partitioner that places the topic's events (see _layout)."""
+        return self._layout(topic)[1]
+
+    def partition_for(self, key: str, topic: str | None = None) -> int:
+        n, part = self._layout(topic) if topic else (self.partitions, self.partitioner)
+        return part(key, n)
+
+    def _partitions(self, topic: str, partitions: list[int] | None) -> list[int]:
+        return partitions if partitions is not None else list(range(self.topic_partitions(topic)))
+
+    def _line_count(self, f: Path) -> tuple[int, int]:
+        """(size, line count) of a journal file, rescanning only if it changed behind us."""
+        size = f.stat().st_size if f.exists() else 0
+        cached = self._counts.get(f)
+        if cached is not None and cached[0] == size:
+            return cached
+        count = 0
+        if size:
+            with open(f, "rb") as r:
+                count = sum(1 for _ in r)
+        self._counts[f] = (size, count)
+        return size, count
+
+    def _segment_index(self, f: Path) -> TimeIndex:
+        """
+        Time index of a partition file. If the file was replaced or written behind our
+        back (another writer, a re-ingest), it is reloaded from disk. Caller holds lock.
+        """
+        idx = self._tindex.get(f)
+        if idx is None or not idx.is_current():
+            idx = self._tindex[f] = TimeIndex(f)
+        return idx
+
+    def _append(self, f: Path, data: bytes, lines: int, ts: Sequence[Any]) -> int:
+        """
+        Append pre-encoded lines (with their ts values, for the time index); returns
+        the offset of the first one. Caller holds lock.
+        """
+        if not f.exists():  # a new segment never inherits an old segment's index
+            f.with_suffix(".tsidx").unlink(missing_ok=True)
+            f.touch()
+        idx = self._segment_index(f)
+        update = idx.prepare(data, ts)  # before the write: nothing can fail after it
+        size, offset = self._line_count(f)
+        with open(f, "ab") as w:
+            w.write(data)
+            w.flush()
+            st = os.fstat(w.fileno())
+        self._counts[f] = (size + len(data), offset + lines)
+        idx.apply(update, st)
+        return offset
+
+    def _lines_from(self, f: Path, offset: int) -> Iterator[bytes]:
+        """Lines of a partition file from `offset` on, seeking via the time index."""
+        if offset:
+            with self.lock:
+                idx = self._segment_index(f)
+            yield from idx.lines_from(offset)
+            return
+        with open(f, "rb") as r:
+            yield from r
 
     def publish(self, topic: str, key: str, payload: dict[str, Any]) -> Envelope:
-        p = self._choose_partition(key)
+        """Append one event; an empty key means keyless (round-robin)."""
+        n, part = self._layout(topic, stamp=True)
+        p = part(key, n)
         f = self._topic_dir(topic) / f"partition-{p}.ndjson"
-        with self.lock:
-            f.touch(exist_ok=True)
-            # count lines for next offset (fine for local/dev scale)
-            offset = sum(1 for _ in open(f))
-            with open(f, "a") as w:
-                w.write(json.dumps(payload) + "\n")
+        with REGISTRY.timer("bus_publish_seconds", topic=topic):
+            data = (json.dumps(payload) + "\n").encode()
+            with self.lock:
+                offset = self._append(f, data, 1, [payload.get("ts")])
+        REGISTRY.inc("bus_published_events_total", topic=topic)
         return Envelope(topic, p, offset, payload)
 
+    def publish_batch(self, topic: str, batch: EventBatch) -> list[BatchEnvelope]:
+        """
+        Publish a columnar batch keyed by symbol. Partitions are computed once per
+        distinct symbol and each partition gets a single append. A partitioner that
+        ignores keys (roundrobin) deals the rows out in turn instead, starting from
+        its next partition, so one batch is spread evenly whatever its symbols.
+        """
+        n, part = self._layout(topic, stamp=True)
+        if not len(batch):
+            parts = np.empty(0, dtype=int)
+        elif part.keyed:
+            by_code = np.array([part(s, n) for s in batch.symbols.tolist()], dtype=int)
+            parts = by_code[batch.symbol_codes]
+        else:
+            parts = (part("", n) + np.arange(len(batch))) % n
+        out: list[BatchEnvelope] = []
+        for p in np.unique(parts).tolist():
+            sub = batch.take(parts == p)
+            f = self._topic_dir(topic) / f"partition-{p}.ndjson"
+            with REGISTRY.timer("bus_publish_batch_seconds", topic=topic):
+                data = sub.to_ndjson()
+                ts = sub.columns["ts"].tolist() if "ts" in sub.columns else [None] * len(sub)
+                with self.lock:
+                    offset = self._append(f, data, len(sub), ts)
+            out.append(BatchEnvelope(topic, p, offset, sub))
+        REGISTRY.inc("bus_published_events_total", len(batch), topic=topic)
+        return out
+
     def subscribe(
-        self, *, group: str, topic: str, partitions: list[int] | None = None
+        self,
+        *,
+        group: str,
+        topic: str,
+        partitions: list[int] | None = None,
+        from_ts: str | datetime | None = None,
     ) -> Iterator[Envelope]:
-        parts = partitions if partitions is not None else list(range(self.partitions))
-        files = [(p, self._topic_dir(topic) / f"partition-{p}.ndjson") for p in parts]
-        # load existing offsets
-        offsets: dict[int, int] = {}
-        for p, _ in files:
+        """
+        Finite stream of each partition from the group's committed offsets, or from
+        the first event at/after `from_ts` when given (committed offsets ignored).
+        `from_ts` is a seek, not a filter: in a partition that is not time-ordered,
+        events after that first one can still be older than `from_ts`.
+        """
+        parts = self._partitions(topic, partitions)
+        offsets = self._start_offsets(group, topic, parts, from_ts)
+        for p in parts:
+            f = self._topic_dir(topic) / f"partition-{p}.ndjson"
+            if not f.exists():
+                continue
+            for i, line in enumerate(self._lines_from(f, offsets.get(p, 0)), offsets.get(p, 0)):
+                payload = json.loads(line)
+                REGISTRY.inc("bus_consumed_events_total", topic=topic)
+                yield Envelope(topic=topic, partition=p, offset=i, payload=payload)
+
+    def _start_offsets(
+        self, group: str, topic: str, parts: list[int], from_ts: str | datetime | None
+    ) -> dict[int, int]:
+        if from_ts is not None:
+            return self.offsets_for_time(topic, from_ts, partitions=parts)
+        start: dict[int, int] = {}
+        for p in parts:
             off_file = self._offset_file(group, topic, p)
             if off_file.exists():
-                offsets[p] = json.loads(off_file.read_text()).get("offset", 0)
-            else:
-                offsets[p] = 0
-        # finite stream across each partition file
-        for p, f in files:
+                start[p] = json.loads(off_file.read_text()).get("offset", 0)
+        return start
+
+    def offsets_for_time(
+        self, topic: str, ts: str | datetime, partitions: list[int] | None = None
+    ) -> dict[int, int]:
+        """Per existing partition, the first offset whose ts >= `ts` (end offset if none)."""
+        out: dict[int, int] = {}
+        with REGISTRY.timer("bus_seek_seconds", topic=topic):
+            for p in self._partitions(topic, partitions):
+                f = self._topic_dir(topic) / f"partition-{p}.ndjson"
+                if f.exists():
+                    with self.lock:
+                        idx = self._segment_index(f)
+                    out[p] = idx.offset_for_time(ts)
+        return out
+
+    def read_batches(
+        self,
+        topic: str,
+        *,
+        partitions: list[int] | None = None,
+        start: dict[int, int] | None = None,
+        batch_size: int = 65_536,
+        from_ts: str | datetime | None = None,
+    ) -> Iterator[BatchEnvelope]:
+        """
+        Read partitions as columnar batches of up to batch_size events, from offset 0,
+        the given `start` offsets, or the first event at/after `from_ts` (a seek, as
+        in subscribe(); later events are not filtered).
+        """
+        schema = SCHEMAS[topic]
+        parts = self._partitions(topic, partitions)
+        if from_ts is not None:
+            start = self.offsets_for_time(topic, from_ts, partitions=parts)
+        for p in parts:
+            f = self._topic_dir(topic) / f"partition-{p}.ndjson"
             if not f.exists():
                 continue
-            with open(f) as r:
-                for i, line in enumerate(r):
-                    if i < offsets[p]:
-                        continue
-                    payload = json.loads(line)
-                    yield Envelope(topic=topic, partition=p, offset=i, payload=payload)
-
-    def commit(self, group: str, env: Envelope) -> None:
+            offset = (start or {}).get(p, 0)
+            lines = self._lines_from(f, offset)
+            while chunk := list(islice(lines, batch_size)):
+                # one json.loads per chunk instead of one per line
+                rows = json.loads(b"[" + b",".join(chunk) + b"]")
+                REGISTRY.inc("bus_consumed_events_total", len(chunk), topic=topic)
+                yield BatchEnvelope(
+                    topic, p, offset, EventBatch.from_rows(schema, rows, trusted=True)
+                )
+                offset += len(chunk)
+
+    def subscribe_batches(
+        self,
+        *,
+        group: str,
+        topic: str,
+        partitions: list[int] | None = None,
+        batch_size: int = 65_536,
+        from_ts: str | datetime | None = None,
+    ) -> Iterator[BatchEnvelope]:
+        """Like subscribe(), but yields columnar batches."""
+        parts = self._partitions(topic, partitions)
+        start = self._start_offsets(group, topic, parts, from_ts)
+        yield from self.read_batches(topic, partitions=parts, start=start, batch_size=batch_size)
+
+    def commit(self, group: str, env: Envelope | BatchEnvelope) -> None:
         off_file = self._offset_file(group, env.topic, env.partition)
-        off_file.write_text(json.dumps({"offset": env.offset + 1}))
+        off_file.write_text(json.dumps({"offset": env.next_offset}))
+        REGISTRY.inc("bus_commits_total", group=group, topic=env.topic)
 
-    def reset(self, group: str, topic: str, partition: int | None = None) -> None:
-        if partition is None:
-            for p in range(self.partitions):
+    def end_offsets(self, topic: str) -> dict[int, int]:
+        """Next offset to be written, per existing partition file."""
+        out: dict[int, int] = {}
+        for f in sorted(self._topic_dir(topic).glob("partition-*.ndjson")):
+            out[int(f.stem.rsplit("-", 1)[1])] = self._line_count(f)[1]
+        return out
+
+    def consumer_lag(self, group: str | None = None) -> list[dict[str, Any]]:
+        """
+        Per group/topic/partition lag from .runtime/offsets: end offset minus
+        committed offset. Also exported as the bus_consumer_lag gauge.
+        """
+        rows: list[dict[str, Any]] = []
+        root = self.base / ".runtime/offsets"
+        groups = [root / group] if group else sorted(d for d in root.iterdir() if d.is_dir())
+        ends: dict[str, dict[int, int]] = {}
+        for gdir in groups:
+            for off_file in sorted(gdir.glob("*.json")):
+                topic, _, part = off_file.stem.rpartition("-")
+                if not topic or not part.isdigit():
+                    continue
+                committed = json.loads(off_file.read_text()).get("offset", 0)
+                if topic not in ends:
+                    ends[topic] = self.end_offsets(topic)
+                end = ends[topic].get(int(part), 0)
+                lag = max(end - committed, 0)
+                REGISTRY.set("bus_consumer_lag", lag, group=gdir.name, topic=topic, partition=part)
+                rows.append(
+                    {
+                        "group": gdir.name,
+                        "topic": topic,
+                        "partition": int(part),
+                        "committed": committed,
+                        "end": end,
+                        "lag": lag,
+                    }
+                )
+        return rows
+
+    def reset(
+        self,
+        group: str,
+        topic: str,
+        partition: int | None = None,
+        to_time: str | datetime | None = None,
+    ) -> dict[int, int]:
+        """
+        Rewind (or fast-forward) a group: to the beginning by default, or to the first
+        event at/after `to_time`. Returns the new offset per partition.
+        """
+        parts = [partition] if partition is not None else self._partitions(topic, None)
+        if to_time is None:
+            for p in parts:
                 self._offset_file(group, topic, p).unlink(missing_ok=True)
-        else:
-            self._offset_file(group, topic, partition).unlink(missing_ok=True)
+            return dict.fromkeys(parts, 0)
+        offsets = self.offsets_for_time(topic, to_time, partitions=parts)
+        for p, o in offsets.items():
+            self._offset_file(group, topic, p).write_text(json.dumps({"offset": o}))
+        return offsets
+
+    def repartition(
+        self, topic: str, partitions: int, partitioner: Partitioner | None = None
+    ) -> dict[str, Any]:
+        """
+        Offline rewrite of `topic` into `partitions` partitions (stop producers and
+        consumers first). Events are re-keyed with event_key() and routed in
+        old-partition order, so each key's events keep their relative order.
+
+        Committed offsets are migrated at-least-once: in every new partition a group
+        resumes at its first event it had not consumed yet, so consumed events that
+        come after it are delivered again (counted as `redelivered`).
+        The topic keeps its current partitioner unless `partitioner` is given.
+        """
+        if partitions < 1:
+            raise ValueError("partitions must be >= 1")
+        part = partitioner or self.topic_partitioner(topic)
+        src = self._topic_dir(topic)
+        old = sorted((int(f.stem.rsplit("-", 1)[1]), f) for f in src.glob("partition-*.ndjson"))
+        committed: dict[str, dict[int, int]] = {}
+        for gdir in sorted(d for d in (self.base / ".runtime/offsets").iterdir() if d.is_dir()):
+            offs = {
+                int(p): json.loads(f.read_text()).get("offset", 0)
+                for f, p in self._group_offset_files(gdir, topic)
+            }
+            if offs:
+                committed[gdir.name] = offs
+
+        tmp = src.with_name(f".{topic}.repartition")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        counts = [0] * partitions
+        resume: dict[str, list[int | None]] = {g: [None] * partitions for g in committed}
+        redelivered = dict.fromkeys(committed, 0)
+        with ExitStack() as stack:
+            outs = [
+                stack.enter_context(open(tmp / f"partition-{q}.ndjson", "wb"))
+                for q in range(partitions)
+            ]
+            for p, f in old:
+                with open(f, "rb") as r:
+                    for off, line in enumerate(r):
+                        q = part(event_key(json.loads(line)), partitions)
+                        j = counts[q]
+                        counts[q] += 1
+                        outs[q].write(line if line.endswith(b"\n") else line + b"\n")
+                        for g, offs in committed.items():
+                            if off >= offs.get(p, 0):
+                                if resume[g][q] is None:
+                                    resume[g][q] = j
+                            elif resume[g][q] is not None:
+                                redelivered[g] += 1
+        (tmp / TOPIC_META).write_text(json.dumps({"partitions": partitions, **part.spec()}))
+
+        with self.lock:
+            trash = src.with_name(f".{topic}.old")
+            shutil.rmtree(trash, ignore_errors=True)
+            src.rename(trash)
+            tmp.rename(src)
+            shutil.rmtree(trash)
+            self._counts = {f: c for f, c in self._counts.items() if f.parent != src}
+            self._tindex = {f: i for f, i in self._tindex.items() if f.parent != src}
+            self._layouts[topic] = (partitions, part)
+
+        groups: dict[str, Any] = {}
+        for g in committed:
+            for f, _ in self._group_offset_files(self.base / ".runtime/offsets" / g, topic):
+                f.unlink()
+            new = [counts[q] if r is None else r for q, r in enumerate(resume[g])]
+            for q, o in enumerate(new):
+                self._offset_file(g, topic, q).write_text(json.dumps({"offset": o}))
+            groups[g] = {"offsets": new, "redelivered": redelivered[g]}
+        return {
+            "topic": topic,
+            "partitions": partitions,
+            "partitioner": part.name,
+            "events": sum(counts),
+            "counts": counts,
+            "groups": groups,
+        }
+
+    @staticmethod
+    def _group_offset_files(gdir: Path, topic: str) -> list[tuple[Path, str]]:
+        """(offset file, partition) pairs of one group for exactly this topic."""
+        out = []
+        for f in gdir.glob(f"{topic}-*.json"):
+            p = f.stem[len(topic) + 1 :]
+            if p.isdigit():
+                out.append((f, p))
+        return out
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import random
+import shutil
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any
@@ -9,15 +10,10 @@ from typing import Any
 import typer
 
 from gptrader import __version__
-from gptrader._schemas import (  # noqa: F401 (referenced in show-schemas)
-    FillV1,
-    NewsV1,
-    OrderV1,
-    QuoteV1,
-)
-from gptrader.bus import LocalBus
-from gptrader.storage import materialize_ndjson_to_parquet
-from gptrader.vectorstore import Doc, LocalHybridIndex
+
+# Heavy subsystems (numpy, pydantic, duckdb, pandas) are imported inside the
+# commands that use them so `gptrader version`/`--help` start fast; see
+# tests/test_cli_startup.py for the import-time budget.
 
 # Use a distinct name for the Typer app so we can wrap it later without mypy conflicts.
 typer_app = typer.Typer(name="gptrader", no_args_is_help=True, help="GPTrader Phase 1 local CLI")
@@ -25,6 +21,15 @@ typer_app = typer.Typer(name="gptrader", no_args_is_help=True, help="GPTrader Ph
 BASE = Path(__file__).resolve().parents[2]
 
 
+def _flush_metrics(command: str) -> None:
+    """Persist the metrics recorded by this command for `gptrader stats`, then reset them."""
+    from gptrader.metrics import REGISTRY
+
+    if REGISTRY.enabled:
+        REGISTRY.write(BASE / ".runtime/metrics", command)
+        REGISTRY.clear()
+
+
 @typer_app.command("version")
 def version() -> None:
     """Print version."""
@@ -46,53 +51,75 @@ def ingest_sample(
     seed: int = typer.Option(42, help="Deterministic seed"),  # noqa: B008
     bars: int = typer.Option(200, help="Number of bars to synthesize"),  # noqa: B008
     symbols: list[str] = typer.Option(["AAPL", "MSFT"], help="Symbols to synthesize"),  # noqa: B008
+    universe: int = typer.Option(0, help="Synthesize N tickers instead of --symbols"),  # noqa: B008
+    model: str = typer.Option("gbm", help="Price process: gbm | jump"),  # noqa: B008
+    sink: str = typer.Option("bus", help="Write to: bus (journal) | parquet"),  # noqa: B008
+    start: str = typer.Option(
+        "", help="ISO start time (default: now - bars minutes)"
+    ),  # noqa: B008
+    batch_bars: int = typer.Option(10_000, help="Bars per generated batch"),  # noqa: B008
+    news: bool = typer.Option(True, help="Also synthesize news headlines"),  # noqa: B008
+    news_rate: float = typer.Option(40.0, help="Headlines per symbol per session"),  # noqa: B008
 ) -> None:
-    """Ingest deterministic sample quotes/news into the local journal."""
-    random.seed(seed)
+    """Ingest deterministic synthetic quotes/news into the local journal or Parquet."""
+    from gptrader.bus import LocalBus
+    from gptrader.storage import concat_parquet, write_batch_parquet
+    from gptrader.synth import MarketSpec, iter_market
+    from gptrader.synth import universe as make_universe
+
+    if model not in ("gbm", "jump") or sink not in ("bus", "parquet"):
+        typer.secho("--model must be gbm|jump and --sink bus|parquet", fg=typer.colors.RED)
+        raise typer.Exit(2)
+    try:
+        t0 = datetime.fromisoformat(start) if start else datetime.now(UTC) - timedelta(minutes=bars)
+    except ValueError as e:  # unparseable --start
+        typer.secho(f"--start: {e}", fg=typer.colors.RED)
+        raise typer.Exit(2) from e
+    spec = MarketSpec(
+        symbols=make_universe(universe) if universe else list(symbols),
+        bars=bars,
+        start=t0,
+        seed=seed,
+        model=model,  # type: ignore[arg-type]
+        news_per_session=news_rate,
+    )
     bus = LocalBus(BASE, partitions=4)
-    start = datetime.now(UTC) - timedelta(minutes=bars)
-
-    # Clear only the files we write (quotes/news)
-    (BASE / "data/journal/quotes.v1").mkdir(parents=True, exist_ok=True)
-    (BASE / "data/journal/news.v1").mkdir(parents=True, exist_ok=True)
-    for p in range(4):
-        f = BASE / "data/journal" / "quotes.v1" / f"partition-{p}.ndjson"
-        if f.exists():
-            f.unlink()
-    nfile = BASE / "data/journal" / "news.v1" / "partition-0.ndjson"
-    if nfile.exists():
-        nfile.unlink()
-
-    # Quotes
-    for i in range(bars):
-        ts = (start + timedelta(minutes=i)).isoformat()
-        for sym in symbols:
-            price = round(100 + 0.01 * i + random.uniform(-0.2, 0.2), 2)
-            vol = int(1000 + 100 * random.random())
-            ev = QuoteV1(symbol=sym, ts=ts, price=price, volume=vol, partition_key=sym)
-            bus.publish(ev.topic, key=sym, payload=ev.model_dump())
-
-    # News (1 partition)
-    headlines = [
-        "Apple raises guidance after strong demand",
-        "Microsoft beats earnings expectations",
-        "Apple product surge delights consumers",
-        "Microsoft faces downgrade concerns",
-        "Neutral industry outlook persists",
-    ]
-    with open(nfile, "w") as w:
-        for i, h in enumerate(headlines):
-            for sym in symbols:
-                ts = (start + timedelta(minutes=i)).isoformat()
-                nv = NewsV1(symbol=sym, ts=ts, headline=h, url=None, partition_key=sym)
-                w.write(json.dumps(nv.model_dump()) + "\n")
-
-    # --- Materialize quotes partition-0 to Parquet for DuckDB demos ---
-    q0 = BASE / "data/journal" / "quotes.v1" / "partition-0.ndjson"
-    if q0.exists():
-        materialize_ndjson_to_parquet(q0, BASE / "data/samples/quotes-part0.parquet")
 
-    typer.echo("✅ Sample ingestion complete.")
+    # Clear only the files the chosen sink writes (quotes/news)
+    out_dir = BASE / "data/samples"
+    part0_dir = out_dir / ".quotes-part0"  # per-chunk files, merged at the end
+    if sink == "parquet":
+        stale = [*out_dir.glob("quotes-[0-9]*.parquet"), *out_dir.glob("news-[0-9]*.parquet")]
+    else:
+        journal = BASE / "data/journal"
+        stale = [*journal.glob("quotes.v1/partition-*.*"), *journal.glob("news.v1/partition-*.*")]
+        stale.append(out_dir / "quotes-part0.parquet")  # journals + time indexes, demo file
+        shutil.rmtree(part0_dir, ignore_errors=True)
+    for f in stale:
+        f.unlink(missing_ok=True)
+
+    n_quotes = 0
+    part0: list[Path] = []
+    for k, chunk in enumerate(iter_market(spec, batch_bars=batch_bars, news=news)):
+        n_quotes += len(chunk.quotes)
+        if sink == "parquet":
+            write_batch_parquet(chunk.quotes, out_dir / f"quotes-{k:05d}.parquet")
+            if chunk.news is not None:
+                write_batch_parquet(chunk.news, out_dir / f"news-{k:05d}.parquet")
+            continue
+        for env in bus.publish_batch("quotes.v1", chunk.quotes):
+            if env.partition == 0:
+                part0.append(part0_dir / f"{k:05d}.parquet")
+                write_batch_parquet(env.batch, part0[-1])
+        if chunk.news is not None:
+            bus.publish_batch("news.v1", chunk.news)
+    # --- quotes partition-0 also go to one Parquet file for DuckDB demos ---
+    if part0:
+        concat_parquet(part0, out_dir / "quotes-part0.parquet")
+        shutil.rmtree(part0_dir)
+
+    _flush_metrics("ingest-sample")
+    typer.echo(f"✅ Sample ingestion complete ({n_quotes} quotes).")
 
 
 # ---------------- Build local hybrid index ----------------
@@ -101,94 +128,322 @@ def ingest_sample(
 @typer_app.command("build-index")
 def build_index() -> None:
     """Build the local hybrid (keyword+vector) news index."""
+    from gptrader.bus import LocalBus
+    from gptrader.vectorstore import Doc, LocalHybridIndex
+
     idx = LocalHybridIndex(BASE / "data/indices/news")
     idx.load()  # load any prior docs (noop on first run)
-    nfile = BASE / "data/journal" / "news.v1" / "partition-0.ndjson"
-    if not nfile.exists():
+    ndir = BASE / "data/journal" / "news.v1"
+    if not any(ndir.glob("partition-*.ndjson")):
         typer.secho("No news found. Run ingest-sample first.", fg=typer.colors.YELLOW)
         raise typer.Exit(1)
 
-    with open(nfile) as r:
-        for i, line in enumerate(r):
-            obj = json.loads(line)
-            doc = Doc(
-                id=f"{obj['symbol']}-{i}",
-                text=obj["headline"],
-                meta={"symbol": obj["symbol"], "ts": obj["ts"]},
+    bus = LocalBus(BASE, partitions=4)
+    for env in bus.read_batches("news.v1"):
+        b = env.batch
+        cols = b.to_columns()
+        for i, (sym, head, ts) in enumerate(
+            zip(
+                cols["symbol"].tolist(), cols["headline"].tolist(), cols["ts"].tolist(), strict=True
+            )
+        ):
+            idx.add(
+                Doc(
+                    id=f"{sym}-{env.partition}-{env.offset + i}",
+                    text=head,
+                    meta={"symbol": sym, "ts": ts},
+                )
             )
-            idx.add(doc)
     idx.persist()
+    _flush_metrics("build-index")
     typer.echo("✅ News index built.")
 
 
 # ---------------- Simple SMA backtest ----------------
 
 
-def _sma(vals: list[float], n: int) -> float | None:
-    if len(vals) < n:
-        return None
-    return sum(vals[-n:]) / n
-
-
 @typer_app.command("run-backtest")
 def run_backtest(
     run_id: str = typer.Option("demo"),  # noqa: B008
     seed: int = typer.Option(42),  # noqa: B008
     bars: int = typer.Option(200),  # noqa: B008
     symbol: str = typer.Option("AAPL"),  # noqa: B008
+    since: str = typer.Option("", help="Only quotes at/after this ISO time"),  # noqa: B008
 ) -> None:
     """Run a deterministic SMA5/20 crossover backtest and write artifacts."""
     random.seed(seed)
     art = BASE / f"artifacts/run-{run_id}"
-    art.mkdir(parents=True, exist_ok=True)
-
-    # Read the single partition we synthesized against for simplicity
-    qfile = BASE / "data/journal" / "quotes.v1" / "partition-0.ndjson"
-    if not qfile.exists():
+    qdir = BASE / "data/journal" / "quotes.v1"
+    if not any(qdir.glob("partition-*.ndjson")):
         typer.secho("No quotes found. Run ingest-sample first.", fg=typer.colors.YELLOW)
         raise typer.Exit(1)
 
-    prices: list[float] = []
-    times: list[str] = []
-    with open(qfile) as r:
-        for line in r:
-            obj = json.loads(line)
-            if obj["symbol"] != symbol:
-                continue
-            prices.append(float(obj["price"]))
-            times.append(obj["ts"])
-
-    pos = 0  # 0 or 1
-    eq = 0.0
-    pnl_rows: list[tuple[str, float]] = []
-    orders = 0
-
-    for i in range(len(prices)):
-        s5 = _sma(prices[: i + 1], 5)
-        s20 = _sma(prices[: i + 1], 20)
-        # signal
-        if s5 is not None and s20 is not None:
-            sig_long = s5 > s20
-            new_pos = 1 if sig_long else 0
-            if new_pos != pos:
-                pos = new_pos
-                orders += 1
-        # pnl update (mark-to-market incremental)
-        if i > 0:
-            eq += (prices[i] - prices[i - 1]) * pos
-        pnl_rows.append((times[i], eq))
-
-    # Write artifacts
-    with open(art / "pnl.csv", "w") as w:
-        w.write("ts,eq\n")
-        for ts, v in pnl_rows:
-            w.write(f"{ts},{v}\n")
-
-    summary = {"run_id": run_id, "symbol": symbol, "orders": orders, "final_eq": eq}
-    (art / "summary.json").write_text(json.dumps(summary, indent=2))
+    if _daemon_call("backtest", run_id=run_id, symbol=symbol, since=since or None) is None:
+        from gptrader.backtest import backtest_to_artifacts
+        from gptrader.bus import LocalBus
+
+        backtest_to_artifacts(LocalBus(BASE, partitions=4), art, run_id, symbol, since or None)
+        _flush_metrics("run-backtest")
     typer.echo(f"✅ Artifacts written to {art}")
 
 
+# ---------------- Daemon ----------------
+
+# Commands below (and run-backtest) go through a running `gptrader serve` when
+# its socket exists, and fall back to doing the work in-process otherwise.
+
+
+def _daemon_call(op: str, **args: Any) -> Any:
+    """Result of `op` from the running daemon, or None when there is none."""
+    from gptrader.rpc import DaemonError, connect
+
+    client = connect(BASE)
+    if client is None:
+        return None
+    try:
+        with client:
+            return client.call(op, **args)
+    except DaemonError as e:
+        typer.secho(f"daemon: {e}", fg=typer.colors.RED)
+        raise typer.Exit(2 if e.kind == "ValidationError" else 1) from e
+    except OSError as e:  # daemon died or timed out mid-call; the op may have run
+        typer.secho(
+            f"daemon: {e or type(e).__name__} (GPTRADER_DAEMON=0 to bypass it)", fg=typer.colors.RED
+        )
+        raise typer.Exit(1) from e
+
+
+@typer_app.command("serve")
+def serve(
+    socket: Path | None = typer.Option(None, help="Unix socket path"),  # noqa: B008
+) -> None:
+    """Keep bus, index and DuckDB warm and serve CLI requests over a Unix socket."""
+    from gptrader.daemon import Daemon
+    from gptrader.rpc import socket_path
+
+    path = socket or socket_path(BASE)
+    typer.echo(f"Serving on {path} (Ctrl-C to stop)")
+    try:
+        Daemon(BASE).run(path)
+    except RuntimeError as e:  # another daemon is already serving this socket
+        typer.secho(str(e), fg=typer.colors.RED)
+        raise typer.Exit(1) from e
+    _flush_metrics("serve")
+
+
+@typer_app.command("search")
+def search(
+    query: str = typer.Argument(..., help="Free-text query"),  # noqa: B008
+    k: int = typer.Option(5, help="Number of results"),  # noqa: B008
+) -> None:
+    """Search the news index (built by build-index)."""
+    hits = _daemon_call("search", query=query, k=k)
+    if hits is None:
+        from gptrader.vectorstore import LocalHybridIndex
+
+        idx = LocalHybridIndex(BASE / "data/indices/news")
+        idx.load()
+        hits = [{"id": d.id, "text": d.text, "score": sc} for d, sc in idx.search(query, k=k)]
+    for h in hits:
+        typer.echo(f"{h['score']:.3f}  {h['id']}  {h['text']}")
+
+
+@typer_app.command("query")
+def query(
+    sql: str = typer.Argument(..., help="SQL over the view `v`"),  # noqa: B008
+    parquet: Path = typer.Option(..., help="Parquet file (or glob) exposed as `v`"),  # noqa: B008
+) -> None:
+    """Run SQL over a Parquet file with DuckDB; prints tab-separated rows."""
+    res = _daemon_call("query", sql=sql, parquet=str(parquet.resolve()))
+    if res is None:
+        import duckdb
+
+        from gptrader.storage import query_rows
+
+        with duckdb.connect() as con:
+            cols, rows = query_rows(con, parquet.resolve(), sql)
+        res = {"columns": cols, "rows": rows}
+    typer.echo("\t".join(res["columns"]))
+    for row in res["rows"]:
+        typer.echo("\t".join(str(v) for v in row))
+
+
+@typer_app.command("publish")
+def publish(
+    topic: str = typer.Argument(..., help="Topic, e.g. orders.v1"),  # noqa: B008
+    payload: str = typer.Argument(..., help="Event as a JSON object"),  # noqa: B008
+    key: str = typer.Option("", help="Partition key (default: partition_key/symbol)"),  # noqa: B008
+) -> None:
+    """Append one event to the local journal."""
+    from gptrader.partitioning import event_key
+
+    data = json.loads(payload)
+    key = key or event_key(data)
+    env = _daemon_call("publish", topic=topic, key=key, payload=data)  # validated there
+    if env is None:
+        from gptrader.bus import LocalBus
+        from gptrader.codec import validate_event
+
+        try:
+            event = validate_event(topic, data)
+        except ValueError as ex:  # pydantic.ValidationError
+            typer.secho(f"invalid {topic} event: {ex}", fg=typer.colors.RED)
+            raise typer.Exit(2) from ex
+        e = LocalBus(BASE, partitions=4).publish(topic, key=key, payload=event)
+        env = {"partition": e.partition, "offset": e.offset}
+    typer.echo(f"{topic}[{env['partition']}]@{env['offset']}")
+
+
+# ---------------- Journal maintenance ----------------
+
+
+@typer_app.command("reset")
+def reset(
+    group: str = typer.Argument(..., help="Consumer group"),  # noqa: B008
+    topic: str = typer.Argument(..., help="Topic, e.g. quotes.v1"),  # noqa: B008
+    partition: int | None = typer.Option(None, help="Only this partition"),  # noqa: B008
+    to_time: str = typer.Option("", help="Seek to this ISO time instead"),  # noqa: B008
+) -> None:
+    """Rewind a consumer group to the start of a topic, or to a point in time."""
+    from gptrader.bus import LocalBus
+
+    try:
+        offsets = LocalBus(BASE).reset(group, topic, partition, to_time or None)
+    except ValueError as e:  # unparseable --to-time
+        typer.secho(str(e), fg=typer.colors.RED)
+        raise typer.Exit(2) from e
+    where = f"time {to_time}" if to_time else "the beginning"
+    typer.echo(f"✅ {group} {topic} reset to {where}:")
+    for p, o in offsets.items():
+        typer.echo(f"  [{p}] offset={o}")
+
+
+@typer_app.command("repartition")
+def repartition(
+    topic: str = typer.Argument(..., help="Topic to rewrite, e.g. quotes.v1"),  # noqa: B008
+    partitions: int = typer.Option(..., help="New partition count"),  # noqa: B008
+    partitioner: str = typer.Option("", help="hash | sha256 | roundrobin | map"),  # noqa: B008
+    partition_map: Path | None = typer.Option(None, help="JSON {key: partition}"),  # noqa: B008
+) -> None:
+    """Offline: repartition a topic (same partitioner unless given) and migrate offsets."""
+    from gptrader.bus import LocalBus
+    from gptrader.partitioning import make_partitioner
+
+    if not any((BASE / "data/journal" / topic).glob("partition-*.ndjson")):
+        typer.secho(f"No journal for topic {topic}.", fg=typer.colors.YELLOW)
+        raise typer.Exit(1)
+    try:
+        part = make_partitioner(partitioner, partition_map) if partitioner else None
+        report = LocalBus(BASE).repartition(topic, partitions, part)
+    except ValueError as e:
+        typer.secho(str(e), fg=typer.colors.RED)
+        raise typer.Exit(2) from e
+    typer.echo(
+        f"✅ {topic}: {report['events']} events -> {partitions} partitions "
+        f"({report['partitioner']}) {report['counts']}"
+    )
+    for g, r in report["groups"].items():
+        typer.echo(f"  {g}: offsets={r['offsets']} redelivered={r['redelivered']}")
+
+
+# ---------------- Simulated execution ----------------
+
+
+@typer_app.command("exec-sim")
+def exec_sim(
+    orders: int = typer.Option(1000, help="Orders to submit"),  # noqa: B008
+    batch: int = typer.Option(100, help="Orders per place_orders call"),  # noqa: B008
+    max_in_flight: int = typer.Option(64, help="Open orders allowed at the venue"),  # noqa: B008
+    latency_ms: float = typer.Option(2.0, help="Median venue latency per fill"),  # noqa: B008
+    reject_rate: float = typer.Option(0.01),  # noqa: B008
+    partial_rate: float = typer.Option(0.2, help="Share of orders filled in slices"),  # noqa: B008
+    seed: int = typer.Option(42),  # noqa: B008
+    publish: bool = typer.Option(True, help="Publish orders/fills to the journal"),  # noqa: B008
+    run_id: str = typer.Option("sim"),  # noqa: B008
+) -> None:
+    """Load-test order -> fill latency and throughput against the simulated venue."""
+    import asyncio
+
+    import numpy as np
+
+    from gptrader.adapters.simvenue import SimulatedExecutor, VenueSpec, run_load
+    from gptrader.bus import LocalBus
+
+    if orders < 1 or batch < 1 or max_in_flight < 1:
+        typer.secho("--orders, --batch and --max-in-flight must be >= 1", fg=typer.colors.RED)
+        raise typer.Exit(2)
+    spec = VenueSpec(
+        latency_ms=latency_ms, reject_rate=reject_rate, partial_rate=partial_rate, seed=seed
+    )
+    ex = SimulatedExecutor(
+        LocalBus(BASE, partitions=4) if publish else None,
+        spec,
+        run_id=run_id,
+        max_in_flight=max_in_flight,
+    )
+    syms = ["AAPL", "MSFT", "NVDA", "AMZN"]
+    book = [
+        {"symbol": syms[i % len(syms)], "side": "buy" if i % 2 else "sell", "qty": 10.0}
+        for i in range(orders)
+    ]
+    reports, wall = asyncio.run(run_load(ex, book, batch))
+
+    lat = np.array([r["latency_s"] for r in reports if r["status"] == "filled"])
+    status: dict[str, int] = {}
+    for r in reports:
+        status[r["status"]] = status.get(r["status"], 0) + 1
+    typer.echo(f"orders={len(reports)} wall={wall:.3f}s throughput={len(reports) / wall:,.0f}/s")
+    typer.echo("status: " + ", ".join(f"{k}={v}" for k, v in sorted(status.items())))
+    typer.echo(f"fills={sum(r['fills'] for r in reports)} peak_in_flight={ex.peak_in_flight}")
+    if len(lat):
+        p50, p99 = np.percentile(lat, [50, 99]) * 1e3
+        typer.echo(f"order->fill latency p50={p50:.2f}ms p99={p99:.2f}ms")
+    _flush_metrics("exec-sim")
+
+
+# ---------------- Benchmarks ----------------
+
+
+@typer_app.command("bench")
+def bench(
+    size: str = typer.Option("small", help="Workload size: small | medium | large"),  # noqa: B008
+    only: list[str] = typer.Option([], help="Run only these workloads"),  # noqa: B008
+    repeat: int = typer.Option(5, help="Timed repetitions per workload"),  # noqa: B008
+    warmup: int = typer.Option(1, help="Untimed warmup runs per workload"),  # noqa: B008
+    isolate: bool = typer.Option(False, help="Run each workload in a fresh process"),  # noqa: B008
+    out: Path | None = typer.Option(None, help="Write the JSON report here"),  # noqa: B008
+    baseline: Path | None = typer.Option(None, help="Baseline JSON report"),  # noqa: B008
+    threshold: float = typer.Option(0.2, help="Allowed p50 slowdown vs baseline"),  # noqa: B008
+) -> None:
+    """Benchmark bus, index, storage, codec and backtest hot paths."""
+    from gptrader.bench import SIZES, WORKLOADS, compare, run_suite
+
+    if size not in SIZES or not set(only) <= set(WORKLOADS):
+        typer.secho(f"sizes: {list(SIZES)}; workloads: {list(WORKLOADS)}", fg=typer.colors.RED)
+        raise typer.Exit(2)
+    if repeat < 1:
+        typer.secho("--repeat must be >= 1", fg=typer.colors.RED)
+        raise typer.Exit(2)
+    report = run_suite(size=size, only=only or None, repeat=repeat, warmup=warmup, isolate=isolate)
+    for name, r in report["results"].items():
+        typer.echo(
+            f"{name:<22} p50={r['p50_s'] * 1e3:9.2f}ms p99={r['p99_s'] * 1e3:9.2f}ms "
+            f"{r['ops_per_s']:>14,.0f} ops/s rss={r['peak_rss_mb']:.0f}MB"
+        )
+    if out is not None:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2))
+    if baseline is not None:
+        diff = compare(report, json.loads(baseline.read_text()), threshold)
+        regressed = [n for n, d in diff.items() if d["regressed"]]
+        for name, d in diff.items():
+            flag = "REGRESSED" if d["regressed"] else "ok"
+            typer.echo(f"{name:<22} {d['change']:+.1%} vs baseline  {flag}")
+        if regressed:
+            typer.secho(f"Regressions above {threshold:.0%}: {regressed}", fg=typer.colors.RED)
+            raise typer.Exit(1)
+
+
 # --- Typer/Click compatibility (mypy-safe) ---
 class _TyperClickAdapter:
     """Adapter that looks like a Typer to Typer, and like a Click Command to Click."""
@@ -219,20 +474,81 @@ app: Any = _TyperClickAdapter(typer_app)
 def diag() -> None:
     """Print selected backends and key settings."""
     # delay imports so we don't touch top import block
-    from gptrader.adapters.factory import make_bus, make_executor, make_index
+    from gptrader.adapters.factory import executor_class, make_bus, make_index
+    from gptrader.bus import LocalBus
     from gptrader.config import settings
+    from gptrader.metrics import REGISTRY
 
     b = make_bus().__class__.__name__
     i = make_index().__class__.__name__
-    e = make_executor().__class__.__name__
+    e = executor_class().__name__
     typer.echo("Backends:")
     typer.echo(f"  BUS_BACKEND={settings.bus_backend} -> {b}")
     typer.echo(f"  INDEX_BACKEND={settings.index_backend} -> {i}")
     typer.echo(f"  EXEC_BACKEND={settings.exec_backend} -> {e}")
 
+    mdir = BASE / ".runtime/metrics"
+    typer.echo(f"Metrics: {'enabled' if REGISTRY.enabled else 'disabled'} ({mdir})")
+    lag: dict[str, int] = {}
+    if (BASE / ".runtime/offsets").is_dir():  # don't create a journal just to report on it
+        for row in LocalBus(BASE).consumer_lag():
+            lag[row["group"]] = lag.get(row["group"], 0) + row["lag"]
+    typer.echo("Consumer lag: " + (", ".join(f"{g}={n}" for g, n in lag.items()) or "none"))
 
-if __name__ == "__main__":
-    app()
+
+@app.command("stats")
+def stats(
+    group: str = typer.Option("", help="Only this consumer group"),  # noqa: B008
+    fmt: str = typer.Option("text", "--format", help="text | json | prom"),  # noqa: B008
+    out: Path | None = typer.Option(None, help="Also write the output here"),  # noqa: B008
+) -> None:
+    """Show consumer lag and the metrics recorded by recent commands."""
+    from gptrader.bus import LocalBus
+    from gptrader.metrics import REGISTRY, merge_snapshots, snapshot_to_prometheus
+
+    if fmt not in ("text", "json", "prom"):
+        typer.secho("--format must be text|json|prom", fg=typer.colors.RED)
+        raise typer.Exit(2)
+    lag = LocalBus(BASE).consumer_lag(group or None)
+    runs = {
+        f.stem: json.loads(f.read_text())
+        for f in sorted((BASE / ".runtime/metrics").glob("*.json"))
+    }
+    live = _daemon_call("stats")
+    if live is not None:
+        runs["daemon"] = live
+    merged = merge_snapshots({"stats": REGISTRY.snapshot(), **runs})
+
+    if fmt == "json":
+        text = json.dumps({"consumer_lag": lag, "metrics": merged}, indent=2)
+    elif fmt == "prom":
+        text = snapshot_to_prometheus(merged)
+    else:
+        lines = ["Consumer lag:"]
+        lines += [
+            f"  {r['group']} {r['topic']}[{r['partition']}] "
+            f"committed={r['committed']} end={r['end']} lag={r['lag']}"
+            for r in lag
+        ] or ["  (no committed offsets)"]
+        lines.append("Metrics:")
+        for name, entry in merged.items():
+            if name == "bus_consumer_lag":
+                continue
+            for m in entry["series"]:
+                labels = ",".join(f"{k}={v}" for k, v in m["labels"].items())
+                if entry["type"] == "histogram":
+                    val = (
+                        f"count={m['count']} p50={m['p50_s'] * 1e3:.3f}ms "
+                        f"p99={m['p99_s'] * 1e3:.3f}ms"
+                    )
+                else:
+                    val = f"{m['value']:g}"
+                lines.append(f"  {name}{{{labels}}} {val}")
+        text = "\n".join(lines)
+    typer.echo(text)
+    if out is not None:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(text + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Mapping, Sequence
+from functools import cache
+from typing import Any, TypeVar
+
+import numpy as np
+from pydantic import BaseModel, TypeAdapter
+
+from gptrader._schemas import FillV1, NewsV1, OrderV1, QuoteV1
+
+M = TypeVar("M", bound=BaseModel)
+
+# topic -> schema class (single source of truth is gptrader._schemas)
+SCHEMAS: dict[str, type[BaseModel]] = {
+    "quotes.v1": QuoteV1,
+    "news.v1": NewsV1,
+    "orders.v1": OrderV1,
+    "fills.v1": FillV1,
+}
+
+
+@cache
+def _list_adapter(schema: type[BaseModel]) -> TypeAdapter[Any]:
+    """One compiled validator/serializer per schema, reused across batches."""
+    return TypeAdapter(list[schema])  # type: ignore[valid-type]
+
+
+@cache
+def _column_adapter(annotation: Any) -> TypeAdapter[Any]:
+    return TypeAdapter(list[annotation])
+
+
+_new = object.__new__
+_set = object.__setattr__
+
+
+@cache
+def _template(schema: type[BaseModel]) -> tuple[dict[str, Any], tuple[tuple[str, Any], ...]]:
+    """Field-ordered defaults plus the default factories that must run per event."""
+    tmpl: dict[str, Any] = {}
+    factories: list[tuple[str, Any]] = []
+    for name, f in schema.model_fields.items():
+        if f.default_factory is not None:
+            factories.append((name, f.default_factory))
+        tmpl[name] = None if f.is_required() else f.get_default(call_default_factory=False)
+    return tmpl, tuple(factories)
+
+
+def _construct(schema: type[M], row: Mapping[str, Any]) -> M:
+    """
+    Trusted construction: a leaner model_construct that only fills defaults.
+    Rows must already match the schema; nothing is checked.
+    """
+    tmpl, factories = _template(schema)
+    d = dict(tmpl)
+    d.update(row)
+    for name, factory in factories:
+        if name not in row:
+            d[name] = factory()
+    m = _new(schema)
+    _set(m, "__dict__", d)
+    _set(m, "__pydantic_fields_set__", set(row))
+    _set(m, "__pydantic_extra__", None)
+    _set(m, "__pydantic_private__", None)
+    return m
+
+
+# ---------------- Construction / validation ----------------
+
+
+def validate_batch(
+    schema: type[M], rows: Iterable[Mapping[str, Any]], *, trusted: bool = False
+) -> list[M]:
+    """
+    Build a list of events in one call.
+
+    trusted=True skips validation entirely and is meant for
+    internal producers whose rows are already well-formed.
+    """
+    if trusted:
+        return [_construct(schema, r) for r in rows]
+    out: list[M] = _list_adapter(schema).validate_python(list(rows))
+    return out
+
+
+def validate_event(topic: str, payload: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    The event to journal for `payload`: validated and normalized by the topic's
+    schema when it has one (raises pydantic.ValidationError), as-is otherwise.
+    """
+    schema = SCHEMAS.get(topic)
+    if schema is None:
+        return dict(payload)
+    return validate_batch(schema, [payload])[0].model_dump()
+
+
+def validate_column(name: str, annotation: Any, values: Any) -> np.ndarray:
+    """Validate one field as a whole array; numeric fields come back with a NumPy dtype."""
+    arr = np.asarray(values)
+    try:
+        if annotation is float:
+            if arr.dtype.kind == "O" and not all(
+                isinstance(v, int | float | np.number) for v in arr.flat
+            ):
+                # the float cast would turn None into NaN where pydantic rejects it
+                raise ValueError("expected numbers (None or non-numeric values found)")
+            return np.asarray(arr, dtype=np.float64)
+        if annotation is int:
+            if arr.dtype.kind == "O":
+                if not all(isinstance(v, int | float | np.number) for v in arr.flat):
+                    raise ValueError("expected integers (None or non-numeric values found)")
+                # mixed ints/floats get the float checks below instead of a truncating cast
+                floats = any(isinstance(v, float | np.floating) for v in arr.flat)
+                arr = np.asarray(arr, dtype=np.float64 if floats else np.int64)
+            if arr.dtype.kind == "f":
+                if not np.all(np.isfinite(arr)) or not np.all(arr == np.floor(arr)):
+                    raise ValueError("fractional or non-finite values")
+                if np.any(np.abs(arr) >= 2.0**63):
+                    raise OverflowError("values out of int64 range")
+            elif arr.dtype.kind == "u" and arr.size and arr.max() > np.iinfo(np.int64).max:
+                raise OverflowError("values out of int64 range")
+            elif arr.dtype.kind not in "iub":
+                arr = np.asarray(arr, dtype=np.int64)
+            return arr.astype(np.int64)
+        if annotation is bool:
+            if arr.dtype.kind != "b":
+                raise ValueError("expected a boolean column")
+            return arr
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise ValueError(f"column {name!r}: {exc}") from exc
+    # Strings, literals and optionals: one adapter call for the whole column.
+    col = _column_adapter(annotation).validate_python(arr.tolist())
+    out = np.empty(len(col), dtype=object)
+    out[:] = col
+    return out
+
+
+def validate_columns(
+    schema: type[M], columns: Mapping[str, Sequence[Any] | np.ndarray], *, trusted: bool = False
+) -> list[M]:
+    """
+    Columnar construction: each field is validated once as a whole array
+    (NumPy casts for numeric fields), then events are assembled without
+    per-row validation.
+    """
+    fields = schema.model_fields
+    names = [n for n in columns if n in fields]
+    missing = [n for n, f in fields.items() if f.is_required() and n not in columns]
+    if missing:
+        raise ValueError(f"{schema.__name__}: missing columns {missing}")
+    lengths = {len(columns[n]) for n in names}
+    if len(lengths) > 1:
+        raise ValueError(f"{schema.__name__}: columns have different lengths {sorted(lengths)}")
+
+    if trusted:
+        cols = [np.asarray(columns[n]).tolist() for n in names]
+    else:
+        cols = [validate_column(n, fields[n].annotation, columns[n]).tolist() for n in names]
+    return [
+        _construct(schema, dict(zip(names, row, strict=True))) for row in zip(*cols, strict=True)
+    ]
+
+
+# ---------------- Serialization ----------------
+
+
+def dumps(event: BaseModel) -> bytes:
+    """Serialize one event straight to JSON bytes (no intermediate dict)."""
+    return event.__pydantic_serializer__.to_json(event)
+
+
+def dumps_ndjson(events: Iterable[BaseModel]) -> bytes:
+    """Serialize events as newline-delimited JSON bytes."""
+    return b"".join(dumps(e) + b"\n" for e in events)
+
+
+def loads(schema: type[M], data: str | bytes, *, trusted: bool = False) -> M:
+    if trusted:
+        return _construct(schema, json.loads(data))
+    return schema.model_validate_json(data)
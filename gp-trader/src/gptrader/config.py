@@ -11,12 +11,19 @@ class Settings(BaseSettings):
     # Which adapters to use
     bus_backend: Literal["local", "eventhubs"] = "local"
     index_backend: Literal["local", "aisearch"] = "local"
-    exec_backend: Literal["stub", "alpaca"] = "stub"
+    exec_backend: Literal["stub", "sim", "alpaca"] = "stub"
+
+    # How LocalBus maps event keys to partitions: hash | sha256 | roundrobin | map
+    bus_partitioner: Literal["hash", "sha256", "roundrobin", "map"] = "hash"
+    bus_partition_map: Path | None = None  # JSON {key: partition} for bus_partitioner=map
 
     # Paths
     data_dir: Path = Field(default=Path("data"))
     runtime_dir: Path = Field(default=Path(".runtime"))
 
+    # Hot-path instrumentation (GPTRADER_METRICS_ENABLED=0 turns timers into no-ops)
+    metrics_enabled: bool = True
+
     # Read env vars like GPTRADER_BUS_BACKEND, GPTRADER_DATA_DIR, etc.
     model_config = SettingsConfigDict(env_prefix="GPTRADER_", case_sensitive=False)
 
@@ -0,0 +1,223 @@
+"""
+`gptrader serve`: a long-running process that keeps the bus, the news index and
+a DuckDB connection warm and serves them over a Unix domain socket (protocol in
+gptrader.rpc). Each request runs in the default thread pool, so a slow query or
+backtest doesn't hold up searches on the same or other connections.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import signal
+import threading
+import time
+from collections.abc import Callable
+from contextlib import suppress
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+import duckdb
+
+from gptrader import __version__
+from gptrader.backtest import backtest_to_artifacts
+from gptrader.bus import LocalBus
+from gptrader.codec import validate_event
+from gptrader.metrics import REGISTRY
+from gptrader.rpc import Client, socket_path
+from gptrader.storage import query_rows
+from gptrader.vectorstore import LocalHybridIndex
+
+# Upper bound for one request line (publish payloads, SQL text)
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+class Daemon:
+    def __init__(self, base: Path, partitions: int = 4) -> None:
+        self.base = base
+        self.bus = LocalBus(base, partitions=partitions)
+        self.con = duckdb.connect()
+        self.started = time.time()
+        self._index = LocalHybridIndex(base / "data/indices/news")
+        self._index_stamp: tuple[int, int] | None = None
+        self._index_lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+        self._conns: dict[asyncio.StreamReader, asyncio.Task[Any]] = {}
+        self.ops: dict[str, Callable[..., Any]] = {
+            "ping": self.ping,
+            "search": self.search,
+            "query": self.query,
+            "publish": self.publish,
+            "backtest": self.backtest,
+            "stats": self.stats,
+            "shutdown": self.stop,
+        }
+
+    # ---------------- Operations (run in worker threads) ----------------
+
+    def ping(self) -> dict[str, Any]:
+        return {"pid": os.getpid(), "version": __version__, "uptime_s": time.time() - self.started}
+
+    def index(self) -> LocalHybridIndex:
+        """The news index, reloaded only when `build-index` has rewritten it."""
+        meta = self._index.meta_path
+        st = meta.stat() if meta.exists() else None
+        stamp = (st.st_mtime_ns, st.st_size) if st else None
+        with self._index_lock:
+            if stamp != self._index_stamp:
+                idx = LocalHybridIndex(self._index.base)
+                idx.load()
+                self._index, self._index_stamp = idx, stamp
+            return self._index
+
+    def search(self, query: str, k: int = 5) -> list[dict[str, Any]]:
+        return [
+            {"id": d.id, "text": d.text, "meta": d.meta, "score": s}
+            for d, s in self.index().search(query, k=k)
+        ]
+
+    def query(self, sql: str, parquet: str) -> dict[str, Any]:
+        cols, rows = query_rows(self.con, Path(parquet), sql)
+        return {"columns": cols, "rows": rows}
+
+    def publish(self, topic: str, key: str, payload: dict[str, Any]) -> dict[str, int]:
+        env = self.bus.publish(topic, key=key, payload=validate_event(topic, payload))
+        return {"partition": env.partition, "offset": env.offset}
+
+    def backtest(
+        self, run_id: str = "demo", symbol: str = "AAPL", since: str | None = None
+    ) -> dict[str, Any]:
+        art = self.base / f"artifacts/run-{run_id}"
+        return backtest_to_artifacts(self.bus, art, run_id, symbol, since)
+
+    def stats(self) -> dict[str, Any]:
+        return REGISTRY.snapshot()
+
+    def stop(self) -> None:
+        """Ask the server to exit; safe to call from any thread."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    # ---------------- Server ----------------
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, lock: asyncio.Lock) -> None:
+        rid = None
+        try:
+            req = json.loads(line)
+            rid = req.get("id")
+            op = req["op"]
+            if op not in self.ops:
+                raise ValueError(f"unknown op {op!r}; expected one of {sorted(self.ops)}")
+            with REGISTRY.timer("daemon_request_seconds", op=op):
+                result = await asyncio.to_thread(self.ops[op], **req.get("args", {}))
+            resp = {"id": rid, "ok": True, "result": result}
+        except Exception as e:  # reported to the client, the server keeps going
+            kind = type(e).__name__
+            resp = {"id": rid, "ok": False, "error": f"{kind}: {e}", "type": kind}
+        data = json.dumps(resp, default=str).encode() + b"\n"
+        async with lock:  # one response line at a time per connection
+            writer.write(data)
+            await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        tasks: set[asyncio.Task[None]] = set()
+        current = asyncio.current_task()
+        if current is not None:
+            self._conns[reader] = current
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._respond(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, ValueError):  # client went away / line over the limit
+            pass
+        finally:
+            self._conns.pop(reader, None)
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def serve(self, path: Path, ready: Callable[[], None] | None = None) -> None:
+        """Serve on `path` until stop() (or the `shutdown` op) is called."""
+        if path.exists():
+            try:
+                Client(path, timeout=1.0).close()
+            except OSError:
+                path.unlink()  # stale socket from a daemon that didn't exit cleanly
+            else:
+                raise RuntimeError(f"a daemon is already serving {path}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._loop, self._stop = asyncio.get_running_loop(), asyncio.Event()
+        server = await asyncio.start_unix_server(
+            self._handle, path=str(path), limit=MAX_REQUEST_BYTES
+        )
+        try:
+            async with server:
+                if ready is not None:
+                    ready()
+                await self._stop.wait()
+                # Stop reading new requests but let in-flight ones answer
+                for r in self._conns:
+                    r.feed_eof()
+                await asyncio.gather(*self._conns.values(), return_exceptions=True)
+        finally:
+            path.unlink(missing_ok=True)
+            self.con.close()
+
+    def run(self, path: Path) -> None:
+        """Blocking entry point for `gptrader serve`; SIGINT/SIGTERM stop the server."""
+
+        async def main() -> None:
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, self.stop)
+            await self.serve(path)
+
+        asyncio.run(main())
+
+
+class BackgroundDaemon:
+    """Run a Daemon on its own event-loop thread (tests, benchmarks)."""
+
+    def __init__(self, base: Path, path: Path | None = None) -> None:
+        self.daemon = Daemon(base)
+        self.path = path or socket_path(base)
+        self._ready = threading.Event()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._main, name="gptrader-daemon", daemon=True)
+
+    def _main(self) -> None:
+        try:
+            asyncio.run(self.daemon.serve(self.path, ready=self._ready.set))
+        except BaseException as e:  # surfaced by start()
+            self._error = e
+            self._ready.set()
+
+    def start(self, timeout: float = 10.0) -> BackgroundDaemon:
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"daemon did not start on {self.path}")
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self) -> None:
+        self.daemon.stop()
+        self._thread.join()
+
+    def __enter__(self) -> BackgroundDaemon:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.stop()
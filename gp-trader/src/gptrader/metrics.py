@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import functools
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+LabelKey = tuple[tuple[str, str], ...]
+
+# HDR-style log-linear buckets over integer nanoseconds: each power of two is
+# split into 2**SUB_BITS linear sub-buckets (~12.5% relative precision).
+SUB_BITS = 3
+_SUB = 1 << SUB_BITS
+
+
+def bucket_index(v: int) -> int:
+    if v < _SUB:
+        return max(v, 0)
+    shift = v.bit_length() - 1 - SUB_BITS
+    return (shift + 1) * _SUB + ((v >> shift) - _SUB)
+
+
+def bucket_upper(idx: int) -> int:
+    """Largest value (inclusive) that falls in bucket idx."""
+    if idx < _SUB:
+        return idx
+    shift = idx // _SUB - 1
+    return ((idx % _SUB + _SUB + 1) << shift) - 1
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, n: float = 1.0) -> None:
+        self.value += n
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"value": self.value}
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, v: float) -> None:
+        self.value = v
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"value": self.value}
+
+
+class Histogram:
+    """Latency histogram in nanoseconds with sparse log-linear buckets."""
+
+    kind = "histogram"
+
+    def __init__(self) -> None:
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.sum_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def observe_ns(self, v: int) -> None:
+        i = bucket_index(v)
+        self.buckets[i] = self.buckets.get(i, 0) + 1
+        if not self.count or v < self.min_ns:
+            self.min_ns = v
+        if v > self.max_ns:
+            self.max_ns = v
+        self.count += 1
+        self.sum_ns += v
+
+    def observe(self, seconds: float) -> None:
+        self.observe_ns(int(seconds * 1e9))
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-th percentile (0-100) in seconds, from bucket upper bounds."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen >= rank:
+                return min(bucket_upper(i), self.max_ns) / 1e9
+        return self.max_ns / 1e9
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_s": self.sum_ns / 1e9,
+            "min_s": self.min_ns / 1e9,
+            "max_s": self.max_ns / 1e9,
+            "p50_s": self.percentile(50),
+            "p90_s": self.percentile(90),
+            "p99_s": self.percentile(99),
+            "buckets": {str(bucket_upper(i)): c for i, c in sorted(self.buckets.items())},
+        }
+
+
+class _Timer:
+    """Context manager feeding elapsed nanoseconds into a histogram."""
+
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist: Histogram) -> None:
+        self.hist = hist
+        self.t0 = 0
+
+    def __enter__(self) -> None:
+        self.t0 = _now_ns()
+
+    def __exit__(self, *exc: object) -> None:
+        self.hist.observe_ns(_now_ns() - self.t0)
+
+
+_now_ns = time.perf_counter_ns
+
+Metric = Counter | Gauge | Histogram
+
+HELP: dict[str, str] = {
+    "bus_publish_seconds": "Latency of LocalBus.publish per event",
+    "bus_publish_batch_seconds": "Latency of one partition append in LocalBus.publish_batch",
+    "bus_published_events_total": "Events appended to the journal",
+    "bus_consumed_events_total": "Events read from the journal by consumers",
+    "bus_commits_total": "Consumer offset commits",
+    "bus_seek_seconds": "LocalBus.offsets_for_time latency (time index lookup)",
+    "bus_consumer_lag": "End offset minus committed offset per group/topic/partition",
+    "index_search_seconds": "LocalHybridIndex.search latency",
+    "index_docs": "Documents in the searched index",
+    "storage_write_seconds": "Parquet write latency",
+    "storage_rows_written_total": "Rows written to Parquet",
+    "storage_query_seconds": "DuckDB query latency",
+    "backtest_seconds": "Backtest wall time including journal reads",
+    "backtest_bars_total": "Bars processed by backtests",
+    "backtest_bars_per_second": "Throughput of the last backtest",
+    "daemon_request_seconds": "Latency of one `gptrader serve` request per op",
+    "exec_order_latency_seconds": "Submit-to-final-report latency per order (simulated venue)",
+    "exec_orders_total": "Orders completed by the executor, per final status",
+    "exec_fills_total": "Fills (including partial fills) produced by the executor",
+    "exec_in_flight": "Orders currently open at the venue",
+}
+
+
+class _NullTimer:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+class Registry:
+    """
+    Process-local metric registry. Metrics are keyed by name + labels and created
+    on first use. Updates are plain attribute writes (no locks): cheap, and exact
+    enough under the GIL for operational counters.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._metrics: dict[tuple[str, LabelKey], Metric] = {}
+        self._help: dict[str, str] = dict(HELP)
+
+    def _get(self, cls: type[Metric], name: str, labels: dict[str, Any]) -> Any:
+        # label values are always strings: partition=0 and partition="0" are one series
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ())
+        m = self._metrics.get(key)
+        if m is None:
+            m = self._metrics[key] = cls()
+        return m
+
+    def counter(self, name: str, **labels: Any) -> Counter:
+        return self._get(Counter, name, labels)
+
+    def gauge(self, name: str, **labels: Any) -> Gauge:
+        return self._get(Gauge, name, labels)
+
+    def histogram(self, name: str, **labels: Any) -> Histogram:
+        return self._get(Histogram, name, labels)
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def timer(self, name: str, **labels: Any) -> Any:
+        """Context manager observing elapsed time into histogram `name`."""
+        if not self.enabled:
+            return _NullTimer()
+        return self.histogram(name, **labels).time()
+
+    def timed(self, name: str, **labels: Any) -> Callable[[F], F]:
+        """Decorator form of timer()."""
+
+        def deco(fn: F) -> F:
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.timer(name, **labels):
+                    return fn(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return deco
+
+    def inc(self, name: str, n: float = 1.0, **labels: Any) -> None:
+        if self.enabled:
+            self.counter(name, **labels).inc(n)
+
+    def set(self, name: str, v: float, **labels: Any) -> None:
+        if self.enabled:
+            self.gauge(name, **labels).set(v)
+
+    def clear(self) -> None:
+        self._metrics.clear()
+
+    # ---------------- Export ----------------
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-friendly view: {name: {"type": kind, "series": [{labels, ...values}]}}."""
+        out: dict[str, Any] = {}
+        for (name, labels), m in sorted(self._metrics.items(), key=lambda kv: kv[0]):
+            entry = out.setdefault(name, {"type": m.kind, "help": self._help.get(name, "")})
+            entry.setdefault("series", []).append({"labels": dict(labels), **m.snapshot()})
+        return out
+
+    def to_prometheus(self) -> str:
+        return snapshot_to_prometheus(self.snapshot())
+
+    def write(self, directory: Path, stem: str) -> None:
+        """Write <stem>.json and <stem>.prom snapshots."""
+        directory.mkdir(parents=True, exist_ok=True)
+        snap = self.snapshot()
+        (directory / f"{stem}.json").write_text(json.dumps(snap, indent=2))
+        (directory / f"{stem}.prom").write_text(snapshot_to_prometheus(snap))
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: dict[str, str], extra: dict[str, str] | None = None) -> str:
+    items = {**labels, **(extra or {})}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in items.items()) + "}"
+
+
+def snapshot_to_prometheus(snap: dict[str, Any]) -> str:
+    """Render a snapshot() dict in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for name, entry in snap.items():
+        if entry.get("help"):
+            lines.append(f"# HELP {name} {entry['help']}")
+        lines.append(f"# TYPE {name} {entry['type']}")
+        for s in entry["series"]:
+            labels = s["labels"]
+            if entry["type"] != "histogram":
+                lines.append(f"{name}{_fmt_labels(labels)} {s['value']}")
+                continue
+            cum = 0
+            for upper_ns, c in s["buckets"].items():
+                cum += c
+                le = f"{int(upper_ns) / 1e9:.9g}"
+                lines.append(f"{name}_bucket{_fmt_labels(labels, {'le': le})} {cum}")
+            lines.append(f"{name}_bucket{_fmt_labels(labels, {'le': '+Inf'})} {s['count']}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {s['sum_s']}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {s['count']}")
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def merge_snapshots(snaps: dict[str, dict[str, Any]], label: str = "source") -> dict[str, Any]:
+    """Combine several snapshots into one, tagging each series with label=<key>."""
+    out: dict[str, Any] = {}
+    for src, snap in snaps.items():
+        for name, entry in snap.items():
+            merged = out.setdefault(name, {"type": entry["type"], "help": entry.get("help", "")})
+            for s in entry["series"]:
+                merged.setdefault("series", []).append({**s, "labels": {**s["labels"], label: src}})
+    return out
+
+
+def _default_registry() -> Registry:
+    from gptrader.config import settings
+
+    return Registry(enabled=settings.metrics_enabled)
+
+
+REGISTRY = _default_registry()
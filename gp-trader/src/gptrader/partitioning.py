@@ -0,0 +1,131 @@
+"""
+Key -> partition strategies for LocalBus.
+
+Every partitioner sends keyless events ("") round-robin and caches
+key -> partition per partition count, so a hot symbol costs one dict lookup.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import zlib
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+
+def event_key(payload: Mapping[str, Any]) -> str:
+    """Partition key of an event: partition_key if set, else symbol, else "" (keyless)."""
+    return str(payload.get("partition_key") or payload.get("symbol") or "")
+
+
+class Partitioner:
+    name = "base"
+    # False if a key's events can land on several partitions (no per-key order)
+    keyed = True
+
+    def __init__(self, cache_size: int = 65_536) -> None:
+        self.cache_size = cache_size
+        self._cache: dict[int, dict[str, int]] = {}
+        self._rr = itertools.count()
+
+    def __call__(self, key: str, partitions: int) -> int:
+        if not key:
+            return next(self._rr) % partitions
+        cache = self._cache.get(partitions)
+        if cache is None:
+            cache = self._cache[partitions] = {}
+        p = cache.get(key)
+        if p is None:
+            if len(cache) >= self.cache_size:
+                cache.clear()
+            p = cache[key] = self._assign(key, partitions)
+        return p
+
+    def _assign(self, key: str, partitions: int) -> int:
+        raise NotImplementedError
+
+    def spec(self) -> dict[str, Any]:
+        """JSON description that from_spec() turns back into an equivalent partitioner."""
+        return {"partitioner": self.name}
+
+
+class HashPartitioner(Partitioner):
+    """CRC-32 of the key: stable across runs and platforms, and C-speed via zlib."""
+
+    name = "hash"
+
+    def _assign(self, key: str, partitions: int) -> int:
+        return zlib.crc32(key.encode()) % partitions
+
+
+class Sha256Partitioner(Partitioner):
+    """The original scheme (first two bytes of SHA-256); for journals written before `hash`."""
+
+    name = "sha256"
+
+    def _assign(self, key: str, partitions: int) -> int:
+        return int.from_bytes(hashlib.sha256(key.encode()).digest()[:2], "big") % partitions
+
+
+class MapPartitioner(Partitioner):
+    """Explicit key -> partition assignments; unmapped keys fall back to `fallback`."""
+
+    name = "map"
+
+    def __init__(self, mapping: Mapping[str, int], fallback: Partitioner | None = None) -> None:
+        super().__init__()
+        self.mapping = dict(mapping)
+        self.fallback = fallback or HashPartitioner()
+
+    def _assign(self, key: str, partitions: int) -> int:
+        p = self.mapping.get(key)
+        if p is None:
+            return self.fallback(key, partitions)
+        if not 0 <= p < partitions:
+            raise ValueError(f"partition map sends {key!r} to {p}, topic has {partitions}")
+        return p
+
+    def spec(self) -> dict[str, Any]:
+        return {"partitioner": self.name, "map": self.mapping, "fallback": self.fallback.spec()}
+
+
+class RoundRobinPartitioner(Partitioner):
+    """Ignore keys and spread events evenly; gives up per-key ordering."""
+
+    name = "roundrobin"
+    keyed = False
+
+    def __call__(self, key: str, partitions: int) -> int:
+        return next(self._rr) % partitions
+
+
+PARTITIONERS: dict[str, type[Partitioner]] = {
+    cls.name: cls for cls in (HashPartitioner, Sha256Partitioner, RoundRobinPartitioner)
+}
+
+
+def make_partitioner(name: str = "hash", map_path: Path | None = None) -> Partitioner:
+    """Build a partitioner by name; `map` reads {key: partition} JSON from map_path."""
+    if name == "map":
+        if map_path is None:
+            raise ValueError("the map partitioner needs a JSON {key: partition} file")
+        return MapPartitioner(json.loads(map_path.read_text()))
+    if name not in PARTITIONERS:
+        raise ValueError(f"unknown partitioner {name!r}; expected one of {[*PARTITIONERS, 'map']}")
+    return PARTITIONERS[name]()
+
+
+def from_spec(spec: Mapping[str, Any]) -> Partitioner:
+    """Inverse of Partitioner.spec(), e.g. from a topic's topic.json."""
+    if spec["partitioner"] == "map":
+        return MapPartitioner(spec["map"], fallback=from_spec(spec["fallback"]))
+    return make_partitioner(spec["partitioner"])
+
+
+def default_partitioner() -> Partitioner:
+    from gptrader.config import settings
+
+    return make_partitioner(settings.bus_partitioner, settings.bus_partition_map)
@@ -0,0 +1,93 @@
+"""
+Client side of the `gptrader serve` daemon.
+
+Protocol: newline-delimited JSON over a Unix domain socket. A request is
+{"id": any, "op": str, "args": {...}} and gets exactly one response line,
+{"id": ..., "ok": true, "result": ...} or
+{"id": ..., "ok": false, "error": str, "type": exception class name}.
+The daemon handles requests on one connection concurrently, so responses may
+come back out of order; match them by id.
+
+This module only needs the standard library so CLI commands can reach a running
+daemon without importing numpy/pydantic/duckdb (or asyncio). Set
+GPTRADER_DAEMON=0 to make the CLI ignore a running daemon.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+SOCKET_NAME = ".runtime/gptrader.sock"
+
+
+class DaemonError(RuntimeError):
+    """The daemon accepted a request but failed to execute it."""
+
+    def __init__(self, message: str, kind: str = "") -> None:
+        super().__init__(message)
+        self.kind = kind  # exception class name on the daemon side, e.g. "ValidationError"
+
+
+def socket_path(base: Path) -> Path:
+    return base / SOCKET_NAME
+
+
+class Client:
+    """Blocking client; requests on one client are sent one at a time."""
+
+    def __init__(self, path: Path, timeout: float | None = 60.0) -> None:
+        self.path = path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(str(path))
+        except OSError:
+            self._sock.close()
+            raise
+        self._reader = self._sock.makefile("rb")
+        self._next_id = 0
+
+    def call(self, op: str, **args: Any) -> Any:
+        self._next_id += 1
+        req = {"id": self._next_id, "op": op, "args": args}
+        self._sock.sendall(json.dumps(req).encode() + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError(f"daemon at {self.path} closed the connection")
+        resp = json.loads(line)
+        if not resp["ok"]:
+            raise DaemonError(resp["error"], resp.get("type", ""))
+        return resp["result"]
+
+    def close(self) -> None:
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self) -> Client:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def connect(base: Path) -> Client | None:
+    """Client for the daemon serving `base`, or None if none is running (or it's disabled)."""
+    if os.environ.get("GPTRADER_DAEMON", "1").lower() in ("0", "false", "no"):
+        return None
+    path = socket_path(base)
+    if not path.exists():
+        return None
+    try:
+        return Client(path)
+    except OSError:  # stale socket file, or a daemon that is not accepting
+        return None
@@ -3,17 +3,23 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import Any
 
 import duckdb
 import pandas as pd
 
+from gptrader.batch import EventBatch
+from gptrader.metrics import REGISTRY
 
+
+@REGISTRY.timed("storage_write_seconds", kind="ndjson")
 def materialize_ndjson_to_parquet(ndjson_path: Path, parquet_path: Path) -> None:
     lines = ndjson_path.read_text().splitlines() if ndjson_path.exists() else []
     rows = [json.loads(line) for line in lines if line.strip()]
     if not rows:
         return
 
+    REGISTRY.inc("storage_rows_written_total", len(rows))
     df = pd.DataFrame(rows)
     parquet_path.parent.mkdir(parents=True, exist_ok=True)
     try:
@@ -25,9 +31,67 @@ def materialize_ndjson_to_parquet(ndjson_path: Path, parquet_path: Path) -> None
             con.execute(f"COPY df TO '{parquet_path.as_posix()}' (FORMAT 'parquet')")
 
 
+@REGISTRY.timed("storage_write_seconds", kind="batch")
+def write_batch_parquet(batch: EventBatch, parquet_path: Path) -> None:
+    """Write a columnar batch straight to Parquet (NumPy arrays scanned by DuckDB, no pandas)."""
+    if not len(batch):
+        return
+    REGISTRY.inc("storage_rows_written_total", len(batch))
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    cols = batch.to_columns()
+    consts = {k: v for k, v in batch.schema.model_fields.items() if k not in cols}
+    select = ", ".join(
+        f"{duckdb.ConstantExpression(consts[k].default)} AS {k}" if k in consts else f'"{k}"'
+        for k in batch.schema.model_fields
+    )
+    with duckdb.connect() as con:
+        con.register("batch", cols)
+        con.execute(
+            f"COPY (SELECT {select} FROM batch) TO '{parquet_path.as_posix()}' (FORMAT 'parquet')"
+        )
+
+
+@REGISTRY.timed("storage_write_seconds", kind="concat")
+def concat_parquet(parts: list[Path], parquet_path: Path) -> None:
+    """Concatenate Parquet files, in order, into one; DuckDB streams them (bounded memory)."""
+    if not parts:
+        return
+    files = ", ".join(f"'{p.as_posix()}'" for p in parts)
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    with duckdb.connect() as con:
+        con.execute("SET preserve_insertion_order = true")
+        con.execute(
+            f"COPY (SELECT * FROM read_parquet([{files}])) "
+            f"TO '{parquet_path.as_posix()}' (FORMAT 'parquet')"
+        )
+
+
+@REGISTRY.timed("storage_query_seconds")
 def duckdb_query(parquet_path: Path, sql: str) -> pd.DataFrame:
     with duckdb.connect() as con:
         con.execute(
             f"CREATE OR REPLACE VIEW v AS SELECT * FROM read_parquet('{parquet_path.as_posix()}')"
         )
         return con.execute(sql).df()
+
+
+@REGISTRY.timed("storage_query_seconds")
+def query_rows(
+    con: duckdb.DuckDBPyConnection, parquet_path: Path, sql: str
+) -> tuple[list[str], list[tuple[Any, ...]]]:
+    """
+    Like duckdb_query() but on a caller-owned connection and without pandas:
+    returns (column names, row tuples). `v` is a temp view, so concurrent
+    cursors of one connection don't see each other's.
+    """
+    cur = con.cursor()
+    try:
+        cur.execute(
+            "CREATE OR REPLACE TEMP VIEW v AS "
+            f"SELECT * FROM read_parquet('{parquet_path.as_posix()}')"
+        )
+        cur.execute(sql)
+        cols = [d[0] for d in cur.description or []]
+        return cols, cur.fetchall()
+    finally:
+        cur.close()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Literal
+
+import numpy as np
+
+from gptrader._schemas import NewsV1, QuoteV1
+from gptrader.batch import EventBatch
+
+# 1-minute bars, 390 per regular session, 252 sessions per year
+BARS_PER_SESSION = 390
+BARS_PER_YEAR = 252 * BARS_PER_SESSION
+
+HEADLINES: dict[str, list[str]] = {
+    "pos": [
+        "{sym} raises guidance after strong demand",
+        "{sym} beats earnings expectations",
+        "{sym} product surge delights consumers",
+        "Analysts upgrade {sym} on margin expansion",
+    ],
+    "neg": [
+        "{sym} faces downgrade concerns",
+        "{sym} misses revenue estimates",
+        "Regulators open probe into {sym}",
+        "{sym} cuts outlook amid weak orders",
+    ],
+    "neu": [
+        "Neutral industry outlook persists for {sym}",
+        "{sym} holds annual shareholder meeting",
+        "{sym} trades in line with sector",
+        "{sym} announces scheduled board changes",
+    ],
+}
+
+
+@dataclass
+class MarketSpec:
+    """
+    Parameters of the synthetic market. Paths are deterministic per (seed, symbol)
+    and do not depend on how the run is chunked into batches.
+    """
+
+    symbols: list[str]
+    bars: int
+    start: datetime
+    seed: int = 42
+    model: Literal["gbm", "jump"] = "gbm"
+    s0: float = 100.0
+    mu: float = 0.05  # annualized drift
+    sigma: float = 0.2  # annualized volatility
+    jump_intensity: float = 25.0  # expected jumps per year (jump model only)
+    jump_mean: float = 0.0  # mean log jump size
+    jump_std: float = 0.02  # std of log jump size
+    base_volume: int = 1000  # mean volume per bar
+    news_per_session: float = 2.0  # expected headlines per symbol per session
+    news_threshold: float = 0.0005  # |bar log return| beyond which news is pos/neg
+    bar_seconds: int = 60
+
+
+def universe(n: int, prefix: str = "SYM") -> list[str]:
+    """Synthetic ticker names SYM0000..SYM{n-1} for large-universe runs."""
+    width = max(4, len(str(n - 1)))
+    return [f"{prefix}{i:0{width}d}" for i in range(n)]
+
+
+def symbol_streams(seed: int, symbol: str) -> list[np.random.Generator]:
+    """Independent generators per symbol: diffusion, jump count, jump size, volume, news."""
+    ss = np.random.SeedSequence([seed, zlib.crc32(symbol.encode())])
+    return [np.random.default_rng(s) for s in ss.spawn(5)]
+
+
+def volume_curve(bar_index: np.ndarray) -> np.ndarray:
+    """Intraday U-shape (heavy open/close, quiet midday), mean 1 over a session."""
+    x = (bar_index % BARS_PER_SESSION) / (BARS_PER_SESSION - 1)
+    u = 1.0 + 3.0 * (2.0 * x - 1.0) ** 2
+    return u / 2.0  # mean of 1 + 3t^2 over t in [-1, 1] is 2
+
+
+@dataclass
+class MarketChunk:
+    quotes: EventBatch
+    news: EventBatch | None
+
+
+def _timestamps(spec: MarketSpec, lo: int, hi: int) -> np.ndarray:
+    aware = spec.start.tzinfo is not None
+    start = spec.start.astimezone(UTC).replace(tzinfo=None) if aware else spec.start
+    t = np.datetime64(start, "us") + np.arange(lo, hi) * np.timedelta64(spec.bar_seconds, "s")
+    suffix = "+00:00" if aware else ""
+    return np.char.add(np.datetime_as_string(t, unit="us"), suffix).astype(object)
+
+
+def iter_market(
+    spec: MarketSpec, *, batch_bars: int = 10_000, batch_symbols: int = 500, news: bool = True
+) -> Iterator[MarketChunk]:
+    """
+    Yield quote (and news) batches covering batch_bars x batch_symbols each,
+    time-major within a batch. Batches come out in time order: every symbol block
+    of one bar range before the next range, like a live feed replay. Memory stays
+    bounded by the batch size (plus one generator set per symbol).
+    """
+    dt = spec.bar_seconds / 60 / BARS_PER_YEAR
+    drift = (spec.mu - 0.5 * spec.sigma**2) * dt
+    vol = spec.sigma * np.sqrt(dt)
+    lam = spec.jump_intensity * dt if spec.model == "jump" else 0.0
+    p_news = spec.news_per_session / BARS_PER_SESSION
+    sentiments = np.array(["neg", "neu", "pos"], dtype=object)
+
+    blocks = [
+        spec.symbols[s_lo : s_lo + batch_symbols]
+        for s_lo in range(0, len(spec.symbols), batch_symbols)
+    ]
+    streams_by_block = [[symbol_streams(spec.seed, s) for s in syms] for syms in blocks]
+    last_logs = [np.full(len(syms), np.log(spec.s0)) for syms in blocks]
+
+    for lo in range(0, spec.bars, batch_bars):
+        hi = min(lo + batch_bars, spec.bars)
+        n = hi - lo
+        ts = _timestamps(spec, lo, hi)
+        for b, syms in enumerate(blocks):
+            streams = streams_by_block[b]
+            z = np.column_stack([st[0].standard_normal(n) for st in streams])
+            r = drift + vol * z
+            if lam > 0:
+                k = np.column_stack([st[1].poisson(lam, n) for st in streams])
+                jz = np.column_stack([st[2].standard_normal(n) for st in streams])
+                r += k * spec.jump_mean + np.sqrt(k) * spec.jump_std * jz
+            logp = last_logs[b] + np.cumsum(r, axis=0)
+            last_logs[b] = logp[-1]
+            prices = np.round(np.exp(logp), 2)
+
+            noise = np.column_stack([st[3].lognormal(0.0, 0.25, n) for st in streams])
+            curve = volume_curve(np.arange(lo, hi))[:, None]
+            volumes = np.maximum(1, spec.base_volume * curve * noise).astype(np.int64)
+
+            sym_arr = np.array(syms, dtype=object)
+            rows_n = n * len(syms)
+            # symbols are already a dictionary: build the batch without re-encoding
+            quotes = EventBatch(
+                QuoteV1,
+                {
+                    "ts": np.repeat(ts, len(syms)),
+                    "price": prices.ravel(),
+                    "volume": volumes.ravel(),
+                    "source": np.full(rows_n, "synthetic", dtype=object),
+                    "partition_key": np.tile(sym_arr, n),
+                },
+                sym_arr,
+                np.tile(np.arange(len(syms), dtype=np.int32), n),
+            )
+
+            news_batch = None
+            if news:
+                u = np.column_stack([st[4].random(n) for st in streams])
+                rows, cols = np.nonzero(u < p_news)
+                if rows.size:
+                    rr = r[rows, cols]
+                    sent = sentiments[
+                        (rr > spec.news_threshold).astype(int)
+                        - (rr < -spec.news_threshold).astype(int)
+                        + 1
+                    ]
+                    # u / p_news is uniform on [0, 1) given a hit: reuse it to pick a template
+                    frac = u[rows, cols] / p_news
+                    heads = [
+                        HEADLINES[s][int(f * len(HEADLINES[s]))].format(sym=syms[c])
+                        for s, f, c in zip(sent.tolist(), frac.tolist(), cols.tolist(), strict=True)
+                    ]
+                    news_batch = EventBatch.from_columns(
+                        NewsV1,
+                        {
+                            "symbol": sym_arr[cols],
+                            "ts": ts[rows],
+                            "headline": heads,
+                            "sentiment_hint": sent,
+                            "partition_key": sym_arr[cols],
+                        },
+                        trusted=True,
+                    )
+            yield MarketChunk(quotes, news_batch)
@@ -0,0 +1,261 @@
+"""
+Sparse time index of one journal segment (a partition-<p>.ndjson file).
+
+Every INDEX_INTERVAL events a block is closed and one entry is appended to
+partition-<p>.tsidx: "<max ts so far, epoch µs> <end offset> <end byte position>".
+Because the recorded ts is a running maximum, entries are sorted and a lookup
+is a bisect plus a scan of at most one block, even when timestamps within a
+partition are not perfectly ordered. The open tail block is kept in memory;
+an index that is missing or behind its segment catches up on load.
+
+The journal does not validate payloads, so a ts that is missing or not ISO8601
+is indexed as NO_TS (it never matches a seek) rather than rejected.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+INDEX_INTERVAL = 1024
+
+# Placeholder max for blocks whose events carry no (valid) ts
+NO_TS = -(2**63)
+
+
+def ts_micros(ts: str | datetime) -> int:
+    """Epoch microseconds of an ISO8601 string or datetime; naive values are UTC."""
+    dt = datetime.fromisoformat(ts) if isinstance(ts, str) else ts
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return (dt - _EPOCH) // _MICRO
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MICRO = datetime(1970, 1, 1, 0, 0, 0, 1, tzinfo=UTC) - _EPOCH
+
+
+def event_micros(value: Any) -> int:
+    """ts_micros of an event's ts, NO_TS if it is not a parseable ISO8601 string."""
+    if not isinstance(value, str):
+        return NO_TS
+    try:
+        return ts_micros(value)
+    except (ValueError, OverflowError):
+        return NO_TS
+
+
+def max_micros(values: Sequence[Any]) -> int:
+    """Largest valid ts among values (others ignored), NO_TS if there is none."""
+    strs = [v for v in values if isinstance(v, str)]
+    if not strs:
+        return NO_TS
+    # One fixed-width format and timezone (what the generators emit): string order
+    # is time order, so only the maximum needs parsing.
+    if len(set(map(len, strs))) == 1 and len({s[19:].lstrip(".0123456789") for s in strs}) == 1:
+        top = event_micros(max(strs))
+        if top != NO_TS:
+            return top
+    return max(map(event_micros, strs))
+
+
+def _line_ts(line: bytes) -> Any:
+    try:
+        return json.loads(line).get("ts")
+    except (ValueError, AttributeError):  # torn last line of a crashed writer, or not an object
+        return None
+
+
+def _file_id(st: os.stat_result) -> tuple[int, int, int, int]:
+    return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+
+
+@dataclass
+class _Tail:
+    """The open block: events after the last entry."""
+
+    offset: int = 0
+    position: int = 0
+    n: int = 0
+    nbytes: int = 0
+    max_ts: int = NO_TS
+
+
+@dataclass
+class _Update:
+    """What appending some lines does to an index; built by prepare(), applied by apply()."""
+
+    entries: list[tuple[int, int, int]] = field(default_factory=list)  # closed blocks
+    tail: _Tail = field(default_factory=_Tail)
+
+
+class TimeIndex:
+    def __init__(self, segment: Path, interval: int = INDEX_INTERVAL) -> None:
+        self.segment = segment
+        self.path = segment.with_suffix(".tsidx")
+        self.interval = interval
+        self.max_ts: list[int] = []  # running max ts through each closed block
+        self.offsets: list[int] = []  # offset just past each closed block
+        self.positions: list[int] = []  # byte position of that offset
+        self.tail = _Tail()
+        self._file_id: tuple[int, int, int, int] | None = None  # of the segment as last seen
+        self._load()
+
+    # ---------------- State ----------------
+
+    @property
+    def end_offset(self) -> int:
+        return self.tail.offset + self.tail.n
+
+    @property
+    def end_position(self) -> int:
+        return self.tail.position + self.tail.nbytes
+
+    def is_current(self) -> bool:
+        """True if the segment is the same file, unchanged since this index last saw it."""
+        try:
+            st = self.segment.stat()
+        except FileNotFoundError:
+            return False
+        return _file_id(st) == self._file_id and st.st_size == self.end_position
+
+    def _load(self) -> None:
+        """Read the index file, drop entries past the segment's end, then index the rest."""
+        self.max_ts, self.offsets, self.positions = [], [], []
+        size = self.segment.stat().st_size if self.segment.exists() else 0
+        stale = False
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                try:
+                    ts, off, pos = (int(x) for x in line.split())
+                except ValueError:  # torn by a crashed writer
+                    stale = True
+                    break
+                if pos > size or (self.offsets and off <= self.offsets[-1]):
+                    stale = True
+                    break
+                self.max_ts.append(ts)
+                self.offsets.append(off)
+                self.positions.append(pos)
+        if stale:
+            self.path.write_text("".join(self._format(i) for i in range(len(self.offsets))))
+        self.tail = self._empty_tail()
+        self.catch_up()
+        if self.segment.exists():
+            self._file_id = _file_id(self.segment.stat())
+
+    def _empty_tail(self) -> _Tail:
+        return _Tail(
+            self.offsets[-1] if self.offsets else 0, self.positions[-1] if self.positions else 0
+        )
+
+    def catch_up(self) -> None:
+        """Index events appended to the segment behind this object's back."""
+        if not self.segment.exists() or self.segment.stat().st_size == self.end_position:
+            return
+        with open(self.segment, "rb") as r:
+            r.seek(self.end_position)
+            while lines := r.readlines(1 << 22):  # ~4 MiB at a time
+                self.add(b"".join(lines), [_line_ts(x) for x in lines], [len(x) for x in lines])
+
+    def _format(self, i: int) -> str:
+        return f"{self.max_ts[i]} {self.offsets[i]} {self.positions[i]}\n"
+
+    def _last_offset_on_disk(self) -> int:
+        """End offset of the last entry in the index file (another writer may be ahead)."""
+        try:
+            with open(self.path, "rb") as r:
+                r.seek(max(r.seek(0, os.SEEK_END) - 256, 0))
+                lines = r.read().split(b"\n")
+        except FileNotFoundError:
+            return 0
+        for line in reversed(lines):
+            parts = line.split()
+            if len(parts) == 3:
+                return int(parts[1])
+        return 0
+
+    # ---------------- Build ----------------
+
+    def prepare(
+        self, data: bytes, ts_values: Sequence[Any], line_lengths: Sequence[int] | None = None
+    ) -> _Update:
+        """
+        Compute what appending `data` (len(ts_values) lines) does to the index,
+        without changing anything, so it can run before the journal write.
+        """
+        n = len(ts_values)
+        t = self.tail
+        if t.n + n < self.interval:  # stays inside the open block
+            tail = _Tail(
+                t.offset,
+                t.position,
+                t.n + n,
+                t.nbytes + len(data),
+                max(t.max_ts, max_micros(ts_values)),
+            )
+            return _Update([], tail)
+        if line_lengths is None:
+            line_lengths = [len(x) + 1 for x in data.split(b"\n")[:-1]]
+        entries: list[tuple[int, int, int]] = []
+        running = self.max_ts[-1] if self.max_ts else NO_TS
+        i = 0
+        while n - i >= self.interval - t.n:
+            take = self.interval - t.n
+            running = max(running, t.max_ts, max_micros(ts_values[i : i + take]))
+            end = t.position + t.nbytes + sum(line_lengths[i : i + take])
+            entries.append((running, t.offset + self.interval, end))
+            t = _Tail(t.offset + self.interval, end)
+            i += take
+        tail = _Tail(t.offset, t.position, n - i, sum(line_lengths[i:]), max_micros(ts_values[i:]))
+        return _Update(entries, tail)
+
+    def apply(self, update: _Update, st: os.stat_result | None = None) -> None:
+        """Record an update once its lines are in the segment (`st`: its stat after that)."""
+        if update.entries:
+            on_disk = self._last_offset_on_disk()
+            with open(self.path, "a") as w:
+                for ts, off, pos in update.entries:
+                    self.max_ts.append(ts)
+                    self.offsets.append(off)
+                    self.positions.append(pos)
+                    if off > on_disk:  # never duplicate entries another writer already added
+                        w.write(self._format(len(self.offsets) - 1))
+        self.tail = update.tail
+        self._file_id = _file_id(st or self.segment.stat())
+
+    def add(
+        self, data: bytes, ts_values: Sequence[Any], line_lengths: Sequence[int] | None = None
+    ) -> None:
+        """Account for `data` (len(ts_values) lines) just appended to the segment."""
+        self.apply(self.prepare(data, ts_values, line_lengths))
+
+    # ---------------- Lookup ----------------
+
+    def lines_from(self, offset: int) -> Iterator[bytes]:
+        """Raw lines of the segment starting at `offset`, seeking to the nearest block."""
+        k = bisect.bisect_right(self.offsets, offset)
+        start, pos = (self.offsets[k - 1], self.positions[k - 1]) if k else (0, 0)
+        with open(self.segment, "rb") as r:
+            r.seek(pos)
+            for _ in range(offset - start):
+                if not r.readline():
+                    return
+            yield from r
+
+    def offset_for_time(self, ts: str | datetime) -> int:
+        """First offset whose ts >= `ts`; the end offset if there is none."""
+        target = ts_micros(ts)
+        k = bisect.bisect_left(self.max_ts, target)
+        offset = self.offsets[k - 1] if k else 0
+        for line in self.lines_from(offset):
+            if event_micros(_line_ts(line)) >= target:
+                return offset
+            offset += 1
+        return offset
@@ -6,6 +6,8 @@ import re
 from dataclasses import dataclass
 from pathlib import Path
 
+from gptrader.metrics import REGISTRY
+
 _TOKEN = re.compile(r"[A-Za-z0-9_]+")
 
 
@@ -72,7 +74,9 @@ class LocalHybridIndex:
                 self._docs.append(Doc(dm["id"], dm["text"], dm["meta"]))
                 self._vecs.append(ve)
 
+    @REGISTRY.timed("index_search_seconds")
     def search(self, query: str, k: int = 5, alpha: float = 0.7) -> list[tuple[Doc, float]]:
+        REGISTRY.set("index_docs", len(self._docs))
         qv = _embed(query)
         scored: list[tuple[Doc, float]] = []
         for d, e in zip(self._docs, self._vecs, strict=True):
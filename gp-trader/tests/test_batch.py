@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from gptrader._schemas import NewsV1, QuoteV1
+from gptrader.backtest import run_sma_backtest, sma, sma_crossover
+from gptrader.batch import EventBatch
+from gptrader.bus import LocalBus
+from gptrader.storage import duckdb_query, write_batch_parquet
+
+
+def _quotes(n: int = 30) -> EventBatch:
+    return EventBatch.from_columns(
+        QuoteV1,
+        {
+            "symbol": ["AAPL", "MSFT"] * n,
+            "ts": [f"2025-01-01T00:{i // 2:02d}:00+00:00" for i in range(2 * n)],
+            "price": np.linspace(100.0, 110.0, 2 * n),
+            "volume": np.arange(2 * n),
+        },
+    )
+
+
+def test_batch_roundtrip_and_dictionary_encoding() -> None:
+    b = _quotes(3)
+    assert len(b) == 6 and b.topic == "quotes.v1"
+    assert b.symbols.tolist() == ["AAPL", "MSFT"]
+    assert b.symbol_codes.dtype == np.int32
+    rows = b.to_rows()
+    assert rows[1] == QuoteV1(**rows[1]).model_dump()
+    lines = [json.loads(x) for x in b.to_ndjson().splitlines()]
+    assert lines == rows
+
+    again = EventBatch.from_rows(QuoteV1, rows)
+    assert again.to_rows() == rows
+    both = EventBatch.concat([b, b.where_symbol("MSFT")])
+    assert len(both) == 9 and len(both.where_symbol("MSFT")) == 6
+    assert len(b.where_symbol("NOPE")) == 0
+
+    news = EventBatch.from_models([NewsV1(symbol="A", ts="t", headline='50% "up"')])
+    assert json.loads(news.to_ndjson())["headline"] == '50% "up"'
+
+    with pytest.raises(ValueError, match="missing"):
+        EventBatch.from_columns(QuoteV1, {"symbol": ["A"], "ts": ["t"], "price": [1.0]})
+    with pytest.raises(ValueError, match="price"):
+        EventBatch.from_columns(
+            QuoteV1, {"symbol": ["A"], "ts": ["t"], "price": [None], "volume": [1]}
+        )
+    with pytest.raises(ValueError, match="volume"):
+        EventBatch.from_columns(
+            QuoteV1,
+            {"symbol": ["A"], "ts": ["t"], "price": [1.0], "volume": np.array([1.5], dtype=object)},
+        )
+    with pytest.raises(ValueError, match="length"):
+        EventBatch.from_columns(
+            QuoteV1, {"symbol": ["A"], "ts": ["t", "u"], "price": [1.0], "volume": [1]}
+        )
+    with pytest.raises(ValueError):
+        EventBatch.from_models([])
+    with pytest.raises(ValueError):
+        EventBatch.concat([])
+
+
+def test_bus_publish_and_subscribe_batches(tmp_path: Path) -> None:
+    bus = LocalBus(tmp_path, partitions=4)
+    b = _quotes(10)
+    envs = bus.publish_batch("quotes.v1", b)
+    assert sum(len(e.batch) for e in envs) == 20
+    for e in envs:
+        assert {s for s in e.batch.symbol().tolist()} <= {"AAPL", "MSFT"}
+
+    # per-event publish continues the same offsets
+    env = bus.publish("quotes.v1", key="AAPL", payload=b.where_symbol("AAPL").to_rows()[0])
+    assert env.offset == sum(len(e.batch) for e in envs if e.partition == bus.partition_for("AAPL"))
+
+    got = list(bus.subscribe_batches(group="g", topic="quotes.v1", batch_size=4))
+    assert sum(len(e.batch) for e in got) == 21
+    for e in got:
+        bus.commit("g", e)
+    assert list(bus.subscribe_batches(group="g", topic="quotes.v1")) == []
+    assert list(bus.subscribe(group="g", topic="quotes.v1")) == []
+
+
+def test_write_batch_parquet_and_backtest(tmp_path: Path) -> None:
+    b = _quotes(30)
+    pq = tmp_path / "q.parquet"
+    write_batch_parquet(b, pq)
+    out = duckdb_query(pq, "select count(*) as c, min(topic) as t, min(v) as v from v")
+    assert int(out["c"].iloc[0]) == 60 and out["t"].iloc[0] == "quotes.v1"
+    write_batch_parquet(b.where_symbol("NOPE"), tmp_path / "empty.parquet")
+    assert not (tmp_path / "empty.parquet").exists()
+
+    res = run_sma_backtest([b], "AAPL")
+    assert len(res.equity) == 30 and res.orders == 1
+    aapl = b.where_symbol("AAPL").columns["price"]
+    # rising prices: long from bar 19 (first bar with both SMAs) to the end
+    assert res.final_eq == pytest.approx(aapl[29] - aapl[18])
+    assert run_sma_backtest([b], "NOPE").final_eq == 0.0
+
+
+def test_sma_matches_loop() -> None:
+    prices = np.array([1.0, 3.0, 2.0, 5.0, 4.0, 6.0])
+    assert np.allclose(sma(prices, 3)[2:], [2.0, 10 / 3, 11 / 3, 5.0])
+    assert np.isnan(sma(prices, 10)).all()
+    res = sma_crossover(np.arange(6), prices, fast=2, slow=3)
+    assert res.orders >= 1
+
+
+def _baseline_crossover(prices: list[float]) -> tuple[int, list[float]]:
+    """The original per-bar loop: sum(vals[-n:]) / n, one position update per bar."""
+    pos, eq, orders, curve = 0, 0.0, 0, []
+    for i in range(len(prices)):
+        s5 = sum(prices[i - 4 : i + 1]) / 5 if i >= 4 else None
+        s20 = sum(prices[i - 19 : i + 1]) / 20 if i >= 19 else None
+        if s5 is not None and s20 is not None and int(s5 > s20) != pos:
+            pos, orders = int(s5 > s20), orders + 1
+        if i > 0:
+            eq += (prices[i] - prices[i - 1]) * pos
+        curve.append(eq)
+    return orders, curve
+
+
+def test_crossover_matches_baseline_loop_on_cent_prices() -> None:
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        prices = np.round(100 + np.cumsum(rng.choice([-0.01, 0.0, 0.01], 600)), 2)
+        orders, curve = _baseline_crossover(prices.tolist())
+        res = sma_crossover(np.arange(600), prices)
+        assert res.orders == orders
+        assert res.equity.tolist() == curve
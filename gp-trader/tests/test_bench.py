@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from gptrader import bench
+from gptrader.cli import app
+
+
+@pytest.fixture
+def tiny(monkeypatch):
+    monkeypatch.setitem(bench.SIZES, "small", 400)
+
+
+def test_run_suite_and_compare(tiny) -> None:
+    report = bench.run_suite(size="small", repeat=3, warmup=0)
+    assert set(report["results"]) == set(bench.WORKLOADS)
+    r = report["results"]["backtest"]
+    assert r["repeat"] == 3 and r["p50_s"] <= r["p99_s"] and r["ops_per_s"] > 0
+    assert r["peak_rss_mb"] > 0
+    json.dumps(report)  # serializable
+
+    slower = json.loads(json.dumps(report))
+    slower["results"]["backtest"]["p50_s"] = r["p50_s"] * 10
+    diff = bench.compare(slower, report, threshold=0.2)
+    assert diff["backtest"]["regressed"] and not diff["synth"]["regressed"]
+
+    with pytest.raises(ValueError, match="unknown"):
+        bench.run_suite(only=["nope"])
+
+
+def test_run_suite_isolated() -> None:
+    report = bench.run_suite(size="small", only=["backtest"], repeat=1, warmup=0, isolate=True)
+    assert report["meta"]["isolate"] and report["results"]["backtest"]["ops"] > 0
+
+
+def test_cli_bench_baseline_gate(tmp_path: Path, tiny) -> None:
+    out = tmp_path / "bench.json"
+    args = ["bench", "--only", "backtest", "--only", "codec_validate", "--repeat", "2"]
+    r = CliRunner().invoke(app, [*args, "--out", str(out)])
+    assert r.exit_code == 0, r.output
+    assert "backtest" in r.output
+
+    base = json.loads(out.read_text())
+    base["results"]["backtest"]["p50_s"] = 1e-12  # make the current run look much slower
+    (tmp_path / "base.json").write_text(json.dumps(base))
+    r = CliRunner().invoke(app, [*args, "--baseline", str(tmp_path / "base.json")])
+    assert r.exit_code == 1 and "REGRESSED" in r.output
+
+    r = CliRunner().invoke(app, ["bench", "--size", "huge"])
+    assert r.exit_code == 2
+    assert CliRunner().invoke(app, ["bench", "--repeat", "0"]).exit_code == 2
+    with pytest.raises(ValueError, match="repeat"):
+        bench.run_suite(only=["backtest"], repeat=0)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules that must not be pulled in just to start the CLI.
+HEAVY = ("numpy", "pandas", "duckdb", "pydantic", "pydantic_settings", "pyarrow")
+
+# Cumulative `python -X importtime` budget for `import gptrader.cli` (typer alone is ~0.1s).
+IMPORT_BUDGET_S = 0.5
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _python(*args: str) -> subprocess.CompletedProcess[str]:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([str(SRC), os.environ.get("PYTHONPATH", "")]),
+    }
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True, env=env
+    )
+
+
+def _importtime(module: str) -> dict[str, float]:
+    """Cumulative import seconds per module, parsed from -X importtime output."""
+    out: dict[str, float] = {}
+    for line in _python("-X", "importtime", "-c", f"import {module}").stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        if cumulative.isdigit():
+            out[name] = int(cumulative) / 1e6
+    return out
+
+
+def test_cli_import_is_light() -> None:
+    times = _importtime("gptrader.cli")
+    loaded = sorted(m for m in times if m.split(".")[0] in HEAVY)
+    assert not loaded, f"gptrader.cli imports heavy modules at startup: {loaded[:10]}"
+    assert times["gptrader.cli"] < IMPORT_BUDGET_S, times["gptrader.cli"]
+
+
+def test_light_commands_do_not_load_subsystems() -> None:
+    script = (
+        "import sys\n"
+        "from typer.testing import CliRunner\n"
+        "from gptrader.cli import app\n"
+        "for args in (['version'], ['show-schemas'], ['--help']):\n"
+        "    assert CliRunner().invoke(app, args).exit_code == 0\n"
+        f"print(sorted(m for m in sys.modules if m.split('.')[0] in {HEAVY!r}))\n"
+    )
+    assert _python("-c", script).stdout.strip() == "[]"
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from gptrader._schemas import NewsV1, OrderV1, QuoteV1
+from gptrader.bench import bench_codec
+from gptrader.codec import dumps, dumps_ndjson, loads, validate_batch, validate_columns
+
+
+def _rows(n: int) -> list[dict]:
+    return [
+        {"symbol": "AAPL", "ts": f"2025-01-01T00:00:{i:02d}Z", "price": 100.0 + i, "volume": i}
+        for i in range(n)
+    ]
+
+
+def test_validate_batch_and_trusted_match() -> None:
+    rows = _rows(3)
+    validated = validate_batch(QuoteV1, rows)
+    trusted = validate_batch(QuoteV1, rows, trusted=True)
+    assert validated == trusted
+    assert [q.model_dump() for q in trusted] == [QuoteV1(**r).model_dump() for r in rows]
+
+    with pytest.raises(ValidationError):
+        validate_batch(QuoteV1, [{"symbol": "AAPL", "ts": "t", "price": "x", "volume": 1}])
+
+
+def test_validate_columns_numpy() -> None:
+    cols = {
+        "symbol": np.array(["AAPL", "MSFT"], dtype=object),
+        "ts": ["t0", "t1"],
+        "price": np.array([1.5, 2.5]),
+        "volume": np.array([10.0, 20.0]),
+    }
+    out = validate_columns(QuoteV1, cols)
+    assert [q.volume for q in out] == [10, 20]
+    assert isinstance(out[0].volume, int)
+    assert out == validate_batch(QuoteV1, [{k: v[i] for k, v in cols.items()} for i in range(2)])
+    assert validate_columns(QuoteV1, cols, trusted=True)[1].symbol == "MSFT"
+
+    with pytest.raises(ValueError, match="volume"):
+        validate_columns(QuoteV1, {**cols, "volume": np.array([1.5, 2.0])})
+    for bad in ([None, 2.5], np.array([1.5, None]), [1.5, "x"]):
+        with pytest.raises(ValueError, match="price"):
+            validate_columns(QuoteV1, {**cols, "price": bad})
+    for bad in (
+        np.array([1.5, 2], dtype=object),
+        [None, 2],
+        [2**70, 1],
+        np.array([2.0**70, 1.0]),
+        np.array([2**64 - 1, 1], dtype=np.uint64),
+    ):
+        with pytest.raises(ValueError, match="volume"):
+            validate_columns(QuoteV1, {**cols, "volume": bad})
+    mixed = validate_columns(QuoteV1, {**cols, "volume": np.array([3.0, 4], dtype=object)})
+    assert [q.volume for q in mixed] == [3, 4]
+    with pytest.raises(ValueError, match="missing"):
+        validate_columns(QuoteV1, {"symbol": ["AAPL"]})
+    with pytest.raises(ValueError, match="lengths"):
+        validate_columns(QuoteV1, {**cols, "ts": ["t0"]})
+    with pytest.raises(ValueError):
+        validate_columns(
+            OrderV1,
+            {"run_id": ["r"], "ts": ["t"], "symbol": ["A"], "side": ["hold"], "qty": [1.0]},
+        )
+    with pytest.raises(ValueError, match="dry_run"):
+        validate_columns(
+            OrderV1,
+            {
+                "run_id": ["r"],
+                "ts": ["t"],
+                "symbol": ["A"],
+                "side": ["buy"],
+                "qty": [1.0],
+                "dry_run": [1],
+            },
+        )
+
+
+def test_dumps_roundtrip() -> None:
+    nv = NewsV1(symbol="AAPL", ts="t", headline="Apple beats", partition_key="AAPL")
+    raw = dumps(nv)
+    assert isinstance(raw, bytes)
+    assert json.loads(raw) == nv.model_dump()
+    assert loads(NewsV1, raw) == nv
+    assert loads(NewsV1, raw, trusted=True) == nv
+
+    lines = dumps_ndjson([nv, nv]).splitlines()
+    assert len(lines) == 2 and json.loads(lines[1])["headline"] == "Apple beats"
+
+
+def test_bench_codec_reports_each_schema() -> None:
+    out = bench_codec(n=50)
+    assert set(out) == {"QuoteV1", "NewsV1", "OrderV1", "FillV1"}
+    assert all(v["validate_eps"] > 0 for v in out.values())
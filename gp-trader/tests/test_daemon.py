@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from gptrader.batch import EventBatch
+from gptrader.bus import LocalBus
+from gptrader.cli import app
+from gptrader.daemon import BackgroundDaemon
+from gptrader.rpc import Client, DaemonError, connect, socket_path
+from gptrader.storage import write_batch_parquet
+
+ORDER = json.dumps(
+    {"run_id": "r", "ts": "2025-01-02T14:30:00+00:00", "symbol": "AAPL", "side": "buy", "qty": 1}
+)
+
+
+def _cli(*args: str) -> str:
+    r = CliRunner().invoke(app, list(args))
+    assert r.exit_code == 0, r.output
+    return r.output
+
+
+@pytest.fixture
+def base(tmp_path: Path, monkeypatch) -> Path:
+    import gptrader.cli as cli
+
+    monkeypatch.setattr(cli, "BASE", tmp_path)
+    monkeypatch.delenv("GPTRADER_DAEMON", raising=False)
+    _cli("ingest-sample", "--bars", "120", "--start", "2025-01-02T14:30:00+00:00")
+    return tmp_path
+
+
+def test_cli_goes_through_daemon_with_same_results(base: Path, monkeypatch) -> None:
+    assert connect(base) is None
+    with BackgroundDaemon(base) as d:
+        with Client(d.path) as c:
+            assert c.call("ping")["pid"] > 0
+            assert c.call("search", query="guidance") == []  # no index yet
+        _cli("build-index")  # daemon picks up the rewritten index on next search
+        warm = _cli("search", "apple guidance demand", "--k", "3")
+        assert len(warm.splitlines()) == 3
+
+        _cli("run-backtest", "--run-id", "warm")
+        assert _cli("publish", "orders.v1", ORDER).startswith("orders.v1[")
+        parquet = base / "quotes.parquet"
+        quotes = [e.batch for e in LocalBus(base).read_batches("quotes.v1")]
+        write_batch_parquet(EventBatch.concat(quotes), parquet)
+        out = _cli(
+            "query",
+            "select symbol, count(*) n from v group by 1 order by 1",
+            "--parquet",
+            str(parquet),
+        )
+        assert out.splitlines() == ["symbol\tn", "AAPL\t120", "MSFT\t120"]
+        assert "source=daemon" in _cli("stats")
+
+        monkeypatch.setenv("GPTRADER_DAEMON", "0")
+        assert connect(base) is None
+        assert _cli("search", "apple guidance demand", "--k", "3") == warm
+        _cli("run-backtest", "--run-id", "cold")
+        assert _cli("query", "select count(*) c from v", "--parquet", str(parquet)) == "c\n240\n"
+
+    assert not socket_path(base).exists()
+    summary = {
+        run: json.loads((base / f"artifacts/run-{run}/summary.json").read_text())
+        for run in ("warm", "cold")
+    }
+    assert {**summary["warm"], "run_id": "cold"} == summary["cold"]
+    assert (base / "artifacts/run-warm/pnl.csv").read_text() == (
+        base / "artifacts/run-cold/pnl.csv"
+    ).read_text()
+
+
+def test_pipelined_requests_and_errors(base: Path) -> None:
+    with BackgroundDaemon(base) as d:
+        with pytest.raises(RuntimeError, match="already serving"):
+            BackgroundDaemon(base).start()
+
+        reqs = [
+            {"id": 1, "op": "backtest", "args": {"run_id": "a"}},
+            {"id": 2, "op": "ping"},
+            {"id": 3, "op": "nope"},
+            {"id": 4, "op": "search", "args": {"bogus": 1}},
+        ]
+        with socket.socket(socket.AF_UNIX) as s:
+            s.connect(str(d.path))
+            s.sendall(b"".join(json.dumps(r).encode() + b"\n" for r in reqs) + b"not json\n")
+            s.shutdown(socket.SHUT_WR)
+            resps = [json.loads(line) for line in s.makefile("rb")]
+        by_id = {r["id"]: r for r in resps}
+        assert len(resps) == 5 and by_id[1]["result"]["run_id"] == "a"
+        assert by_id[2]["ok"] and "unknown op" in by_id[3]["error"]
+        assert by_id[4]["error"].startswith("TypeError") and by_id[None]["ok"] is False
+
+        with Client(d.path) as c, pytest.raises(DaemonError):
+            c.call("query", sql="select 1", parquet=str(base / "missing.parquet"))
+        r = CliRunner().invoke(app, ["query", "select 1", "--parquet", "missing.parquet"])
+        assert r.exit_code == 1 and "daemon:" in r.output
+
+
+def test_stale_socket_is_replaced(base: Path) -> None:
+    path = socket_path(base)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("")  # left behind by a killed daemon
+    assert connect(base) is None
+    with BackgroundDaemon(base) as d, Client(d.path) as c:
+        assert (
+            c.call("publish", topic="misc.v1", key="A", payload={"i": 1})["offset"] == 0
+        )  # no schema
+
+
+def test_publish_validates_schemad_topics(base: Path, monkeypatch) -> None:
+    journal = base / "data/journal/orders.v1"
+    bad = '{"symbol": "AAPL", "qty": 1}'
+    r = CliRunner().invoke(app, ["publish", "orders.v1", bad])
+    assert r.exit_code == 2 and "invalid orders.v1 event" in r.output
+    assert not journal.exists()
+    with BackgroundDaemon(base):
+        r = CliRunner().invoke(app, ["publish", "orders.v1", bad])
+        assert r.exit_code == 2 and "daemon: ValidationError" in r.output
+        assert not journal.exists()
+        assert _cli("publish", "orders.v1", ORDER).startswith("orders.v1[")
+    monkeypatch.setenv("GPTRADER_DAEMON", "0")
+    _cli("publish", "orders.v1", ORDER.replace('"qty": 1', '"qty": "2"'))
+    events = [json.loads(x) for f in journal.glob("*.ndjson") for x in f.read_text().splitlines()]
+    assert sorted(e["qty"] for e in events) == [1, 2]  # normalized like the schema
+    assert all(e["type"] == "market" and e["v"] == 1 for e in events)  # defaults filled in
+
+
+def test_dead_daemon_and_second_serve(base: Path) -> None:
+    path = socket_path(base)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with socket.socket(socket.AF_UNIX) as srv:  # accepts, then dies mid-request
+        srv.bind(str(path))
+        srv.listen()
+        t = threading.Thread(target=lambda: srv.accept()[0].close())
+        t.start()
+        r = CliRunner().invoke(app, ["stats"])
+        t.join()
+    assert r.exit_code == 1 and r.output.startswith("daemon:")  # broken pipe or EOF
+    assert r.exception is None or isinstance(r.exception, SystemExit)
+
+    path.unlink()
+    with BackgroundDaemon(base):
+        r = CliRunner().invoke(app, ["serve"])
+        assert r.exit_code == 1 and "already serving" in r.output
+        assert isinstance(r.exception, SystemExit)
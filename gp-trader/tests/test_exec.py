@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from gptrader.adapters.exec import NoopExecutor
+from gptrader.adapters.simvenue import SimulatedExecutor, VenueSpec, run_load
+from gptrader.bus import LocalBus
+from gptrader.cli import app
+
+FAST = VenueSpec(latency_ms=0.2, reject_rate=0.1, partial_rate=0.5, seed=7)
+
+
+def _book(n: int) -> list[dict]:
+    return [
+        {"symbol": ("AAPL", "MSFT")[i % 2], "side": ("buy", "sell")[i % 3 % 2], "qty": 3.0}
+        for i in range(n)
+    ]
+
+
+def test_noop_executor_ids_are_unique() -> None:
+    a, b = NoopExecutor(), NoopExecutor()
+    ids = [a.place_order({"qty": 1})["id"] for _ in range(3)] + [b.place_order({})["id"]]
+    assert len(set(ids)) == 4 and "noop-0" not in ids
+    reports = asyncio.run(a.place_orders([{"qty": 1}, {"qty": 2}]))
+    assert [r["qty"] for r in reports] == [1, 2] and reports[0]["status"] == "simulated"
+
+
+def test_simulated_venue_fills_rejects_and_publishes(tmp_path: Path) -> None:
+    bus = LocalBus(tmp_path, partitions=2)
+    ex = SimulatedExecutor(bus, FAST, run_id="t", max_in_flight=8)
+    reports, wall = asyncio.run(run_load(ex, _book(200), batch_size=32))
+
+    assert wall > 0 and len(reports) == 200
+    assert len({r["id"] for r in reports}) == 200
+    assert [r["symbol"] for r in reports] == [o["symbol"] for o in _book(200)]
+    assert 1 <= ex.peak_in_flight <= 8 and ex.in_flight == 0
+    filled = [r for r in reports if r["status"] == "filled"]
+    rejected = [r for r in reports if r["status"] == "rejected"]
+    assert filled and rejected and len(filled) + len(rejected) == 200
+    assert any(r["fills"] > 1 for r in filled)  # partial fills
+    assert all(r["latency_s"] > 0 for r in reports)
+
+    orders = [e.payload for e in bus.subscribe(group="g", topic="orders.v1")]
+    fills = [e.payload for e in bus.subscribe(group="g", topic="fills.v1")]
+    assert sorted(o["order_id"] for o in orders) == sorted(r["id"] for r in reports)
+    assert len(fills) == sum(r["fills"] for r in reports)
+    by_order: dict[str, float] = {}
+    for f in fills:
+        by_order[f["order_id"]] = by_order.get(f["order_id"], 0.0) + f["qty"]
+    assert by_order == {r["id"]: 3.0 for r in filled}
+    for r in filled:
+        assert (r["avg_price"] > 100.0) == (r["side"] == "buy")
+
+
+def test_simulated_venue_is_deterministic_per_seed() -> None:
+    def outcome() -> list[tuple]:
+        ex = SimulatedExecutor(None, FAST, max_in_flight=4)
+        reports, _ = asyncio.run(run_load(ex, _book(60), batch_size=7))
+        return [(r["status"], r["fills"], r["avg_price"]) for r in reports]
+
+    assert outcome() == outcome()
+
+
+def test_invalid_and_limit_orders() -> None:
+    ex = SimulatedExecutor(spec=VenueSpec(latency_ms=0.1, reject_rate=0.0, partial_rate=0.0))
+    reports = asyncio.run(
+        ex.place_orders(
+            [
+                {"symbol": "A", "side": "hold", "qty": 1},
+                {"symbol": "A", "side": "buy", "qty": 1, "type": "limit"},
+                {"symbol": "A", "side": "sell", "qty": 0},
+                {"symbol": "A", "side": "buy", "qty": 2, "type": "limit", "limit_price": 9.5},
+            ]
+        )
+    )
+    no_price, zero = reports[1], reports[2]
+    assert reports[0]["reason"].startswith("invalid order")
+    assert no_price["status"] == zero["status"] == "rejected" and "limit_price" in zero["reason"]
+    assert reports[3]["status"] == "filled" and reports[3]["avg_price"] == 9.5
+    assert ex.place_order({"symbol": "B", "side": "buy", "qty": 1})["status"] == "filled"
+
+
+def test_factory_sim_backend(tmp_path: Path, monkeypatch) -> None:
+    from gptrader.adapters.factory import executor_class, make_executor
+    from gptrader.config import settings
+
+    monkeypatch.setattr(settings, "exec_backend", "sim")
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    assert executor_class() is SimulatedExecutor and not (tmp_path / "data").exists()
+    ex = make_executor()
+    assert isinstance(ex, SimulatedExecutor)
+    assert ex.place_order({"symbol": "A", "side": "buy", "qty": 1})["status"] == "filled"
+    # same journal as `gptrader exec-sim` with BASE = data_dir.parent
+    assert (tmp_path / "data/journal/orders.v1").is_dir()
+    assert not (tmp_path / "data/data").exists()
+
+    other = make_executor(base=tmp_path / "elsewhere")
+    assert isinstance(other, SimulatedExecutor) and other.bus is not None
+    assert other.bus.base == tmp_path / "elsewhere"
+
+
+def test_exec_sim_cli(tmp_path: Path, monkeypatch) -> None:
+    import gptrader.cli as cli
+
+    monkeypatch.setattr(cli, "BASE", tmp_path)
+    args = ["exec-sim", "--orders", "50", "--batch", "10", "--latency-ms", "0.2"]
+    r = CliRunner().invoke(app, args)
+    assert r.exit_code == 0, r.output
+    assert "orders=50" in r.output and "latency p50=" in r.output
+    assert (tmp_path / "data/journal/fills.v1").is_dir()
+    snap = json.loads((tmp_path / ".runtime/metrics/exec-sim.json").read_text())
+    assert snap["exec_order_latency_seconds"]["series"][0]["count"] > 0
+    assert CliRunner().invoke(app, ["exec-sim", "--orders", "0"]).exit_code == 2
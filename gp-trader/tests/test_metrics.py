@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from gptrader.bus import LocalBus
+from gptrader.cli import app
+from gptrader.metrics import (
+    Registry,
+    bucket_index,
+    bucket_upper,
+    merge_snapshots,
+    snapshot_to_prometheus,
+)
+
+
+def test_buckets_cover_every_value() -> None:
+    for v in [*range(0, 4096), 10**6, 10**9 + 7]:
+        i = bucket_index(v)
+        assert bucket_upper(i) >= v
+        assert i == 0 or bucket_upper(i - 1) < v
+    # relative bucket width stays around 1/8 for large values
+    i = bucket_index(10**6)
+    assert (bucket_upper(i) - bucket_upper(i - 1)) / 10**6 < 0.13
+
+
+def test_registry_histogram_timer_and_export() -> None:
+    r = Registry()
+    h = r.histogram("lat_seconds", topic="q")
+    for v in range(1, 101):
+        h.observe_ns(v * 1000)
+    assert h.count == 100 and h.min_ns == 1000 and h.max_ns == 100_000
+    assert 0.9 * 50e-6 <= h.percentile(50) <= 1.15 * 50e-6
+    assert h.percentile(100) == 100e-6
+
+    @r.timed("work_seconds")
+    def work(x: int) -> int:
+        return x * 2
+
+    assert work(2) == 4
+    with r.timer("lat_seconds", topic="q"):
+        pass
+    r.inc("events_total", 3, topic="q")
+    r.set("lag", 7, group="g", topic='we"ird')
+    r.histogram("lat_seconds", topic="q").observe(0.5)
+    r.set("part", 1, partition=0)
+    r.set("part", 2, partition="0")  # same series: label values are compared as strings
+
+    snap = r.snapshot()
+    assert snap["work_seconds"]["series"][0]["count"] == 1
+    assert snap["events_total"]["series"][0]["value"] == 3
+    assert snap["part"]["series"] == [{"labels": {"partition": "0"}, "value": 2}]
+    text = r.to_prometheus()
+    assert "# TYPE lat_seconds histogram" in text
+    assert 'lat_seconds_bucket{topic="q",le="+Inf"} 102' in text
+    assert 'lag{group="g",topic="we\\"ird"} 7' in text
+
+    merged = merge_snapshots({"a": snap, "b": snap})
+    assert len(merged["events_total"]["series"]) == 2
+    assert 'source="b"' in snapshot_to_prometheus(merged)
+    assert snapshot_to_prometheus({}) == ""
+
+
+def test_disabled_registry_records_nothing() -> None:
+    r = Registry(enabled=False)
+    with r.timer("x"):
+        pass
+    r.inc("c")
+    r.set("g", 1)
+    assert r.snapshot() == {}
+
+
+def test_consumer_lag_and_stats_cli(tmp_path: Path, monkeypatch) -> None:
+    import gptrader.cli as cli
+
+    monkeypatch.setattr(cli, "BASE", tmp_path)
+    bus = LocalBus(tmp_path, partitions=2)
+    for i in range(5):
+        bus.publish("orders.v1", key="AAPL", payload={"symbol": "AAPL", "i": i})
+    envs = list(bus.subscribe(group="g1", topic="orders.v1"))
+    bus.commit("g1", envs[1])
+    (tmp_path / ".runtime/offsets/g1/garbage.json").write_text("{}")
+
+    lag = bus.consumer_lag()
+    assert lag == [
+        {
+            "group": "g1",
+            "topic": "orders.v1",
+            "partition": envs[1].partition,
+            "committed": 2,
+            "end": 5,
+            "lag": 3,
+        }
+    ]
+
+    r = CliRunner().invoke(app, ["ingest-sample", "--bars", "30"])
+    assert r.exit_code == 0, r.output
+    assert (tmp_path / ".runtime/metrics/ingest-sample.prom").exists()
+
+    r = CliRunner().invoke(app, ["stats"])
+    assert r.exit_code == 0, r.output
+    assert "lag=3" in r.output and "bus_published_events_total" in r.output
+
+    out = tmp_path / "stats.json"
+    r = CliRunner().invoke(app, ["stats", "--format", "json", "--group", "g1", "--out", str(out)])
+    assert r.exit_code == 0, r.output
+    data = json.loads(out.read_text())
+    assert data["consumer_lag"][0]["lag"] == 3
+    assert "ingest-sample" in json.dumps(data["metrics"])
+
+    r = CliRunner().invoke(app, ["stats", "--format", "prom"])
+    assert "# TYPE bus_consumer_lag gauge" in r.output
+
+    r = CliRunner().invoke(app, ["diag"])
+    assert "Consumer lag: g1=3" in r.output
+
+    assert CliRunner().invoke(app, ["stats", "--format", "xml"]).exit_code == 2
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import zlib
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from gptrader._schemas import QuoteV1
+from gptrader.adapters.eventbus import LocalEventBus
+from gptrader.batch import EventBatch
+from gptrader.bus import LocalBus
+from gptrader.cli import app
+from gptrader.partitioning import (
+    HashPartitioner,
+    MapPartitioner,
+    RoundRobinPartitioner,
+    Sha256Partitioner,
+    event_key,
+    from_spec,
+    make_partitioner,
+)
+
+SYMS = ["AAPL", "MSFT", "NVDA", "AMZN", "TSLA", "META"]
+
+
+def test_partitioners() -> None:
+    h = HashPartitioner(cache_size=2)
+    assert h("AAPL", 8) == zlib.crc32(b"AAPL") % 8 == h("AAPL", 8)
+    assert [h(s, 8) for s in SYMS] == [zlib.crc32(s.encode()) % 8 for s in SYMS]  # evictions
+    assert len(h._cache[8]) <= 2
+    assert [h("", 3) for _ in range(4)] == [0, 1, 2, 0]  # keyless -> round-robin
+    assert len({h(s, 4) for s in SYMS}) > 1
+
+    assert Sha256Partitioner()("AAPL", 4) == 0  # same placement as before `hash` existed
+
+    m = MapPartitioner({"AAPL": 3}, fallback=Sha256Partitioner())
+    assert m("AAPL", 4) == 3 and m("MSFT", 4) == Sha256Partitioner()("MSFT", 4)
+    with pytest.raises(ValueError, match="has 2"):
+        m("AAPL", 2)
+
+    rr = RoundRobinPartitioner()
+    assert [rr("AAPL", 2) for _ in range(3)] == [0, 1, 0] and not rr.keyed
+
+    assert event_key({"partition_key": "k", "symbol": "s"}) == "k"
+    assert event_key({"partition_key": "", "symbol": "s"}) == "s" and event_key({}) == ""
+
+
+def test_make_partitioner(tmp_path: Path) -> None:
+    assert isinstance(make_partitioner(), HashPartitioner)
+    assert make_partitioner("roundrobin").name == "roundrobin"
+    path = tmp_path / "map.json"
+    path.write_text(json.dumps({"AAPL": 1}))
+    assert make_partitioner("map", path)("AAPL", 2) == 1
+    for name, arg in (("map", None), ("nope", None)):
+        with pytest.raises(ValueError):
+            make_partitioner(name, arg)
+
+
+def test_event_bus_adapter_spreads_events(tmp_path: Path) -> None:
+    bus = LocalEventBus(tmp_path)
+    bus.publish("orders.v1", [{"symbol": s, "i": i} for i, s in enumerate(SYMS)])
+    bus.publish("orders.v1", [{"i": i} for i in range(4)])  # keyless
+    raw = LocalBus(tmp_path)
+    ends = raw.end_offsets("orders.v1")
+    assert sum(ends.values()) == 10 and len(ends) == 4
+    for e in raw.subscribe(group="g", topic="orders.v1"):
+        if "symbol" in e.payload:
+            assert e.partition == raw.partition_for(e.payload["symbol"])
+
+
+def _publish(bus: LocalBus, n: int) -> None:
+    for i in range(n):
+        sym = SYMS[i % len(SYMS)]
+        bus.publish("orders.v1", key=sym, payload={"symbol": sym, "seq": i})
+
+
+def test_repartition_preserves_key_order_and_offsets(tmp_path: Path) -> None:
+    bus = LocalBus(tmp_path, partitions=2)
+    _publish(bus, 60)
+    consumed: set[int] = set()
+    for p in range(2):  # group g has consumed 5 events of each partition
+        envs = list(bus.subscribe(group="g", topic="orders.v1", partitions=[p]))
+        bus.commit("g", envs[4])
+        consumed |= {e.payload["seq"] for e in envs[:5]}
+
+    report = bus.repartition("orders.v1", 3)
+    assert report["events"] == 60 and sum(report["counts"]) == 60 and len(report["counts"]) == 3
+
+    fresh = LocalBus(tmp_path, partitions=2)  # picks the new count up from topic.json
+    assert fresh.topic_partitions("orders.v1") == 3
+    assert fresh.end_offsets("orders.v1") == dict(enumerate(report["counts"]))
+    events = list(fresh.subscribe(group="other", topic="orders.v1"))
+    assert sorted(e.payload["seq"] for e in events) == list(range(60))
+    for sym in SYMS:
+        mine = [e for e in events if e.payload["symbol"] == sym]
+        assert len({e.partition for e in mine}) == 1
+        assert [e.payload["seq"] for e in mine] == sorted(e.payload["seq"] for e in mine)
+
+    redo = [e.payload["seq"] for e in fresh.subscribe(group="g", topic="orders.v1")]
+    assert set(redo) >= set(range(60)) - consumed  # nothing unconsumed is lost
+    assert len(redo) == 60 - len(consumed) + report["groups"]["g"]["redelivered"]
+    offsets = sorted((tmp_path / ".runtime/offsets/g").glob("orders.v1-*.json"))
+    assert [f.stem for f in offsets] == [f"orders.v1-{q}" for q in range(3)]
+
+    # new publishes follow the new layout; shrinking works the same way
+    assert fresh.publish("orders.v1", key="AAPL", payload={}).partition < 3
+    assert bus.repartition("orders.v1", 1, RoundRobinPartitioner())["counts"] == [61]
+    with pytest.raises(ValueError):
+        bus.repartition("orders.v1", 0)
+
+
+def test_repartition_cli(tmp_path: Path, monkeypatch) -> None:
+    import gptrader.cli as cli
+
+    monkeypatch.setattr(cli, "BASE", tmp_path)
+    assert CliRunner().invoke(app, ["repartition", "orders.v1", "--partitions", "2"]).exit_code == 1
+    bus = LocalBus(tmp_path)
+    _publish(bus, 12)
+    bus.commit("g", next(iter(bus.subscribe(group="g", topic="orders.v1"))))
+
+    path = tmp_path / "map.json"
+    path.write_text(json.dumps(dict.fromkeys(SYMS, 1)))
+    args = ["repartition", "orders.v1", "--partitions", "2", "--partitioner", "map"]
+    r = CliRunner().invoke(app, [*args, "--partition-map", str(path)])
+    assert r.exit_code == 0, r.output
+    assert "12 events -> 2 partitions (map) [0, 12]" in r.output and "g: offsets=" in r.output
+
+    r = CliRunner().invoke(
+        app, ["repartition", "orders.v1", "--partitions", "2", "--partitioner", "x"]
+    )
+    assert r.exit_code == 2
+
+
+def _quotes(bus: LocalBus, sym: str, n: int, start: int = 0) -> None:
+    for i in range(start, start + n):
+        ts = f"2025-01-02T14:{i // 60:02d}:{i % 60:02d}+00:00"
+        bus.publish(
+            "quotes.v1", key=sym, payload={"symbol": sym, "ts": ts, "price": 100.0 + i, "volume": 1}
+        )
+
+
+def test_topic_keeps_its_partitioner(tmp_path: Path) -> None:
+    from gptrader.backtest import backtest_to_artifacts
+
+    bus = LocalBus(tmp_path, partitioner=RoundRobinPartitioner())
+    _publish(bus, 4)
+    meta = json.loads((tmp_path / "data/journal/orders.v1/topic.json").read_text())
+    assert meta == {"partitions": 4, "partitioner": "roundrobin"}  # stamped on first publish
+    assert LocalBus(tmp_path).topic_partitioner("orders.v1").name == "roundrobin"
+
+    # after a map repartition, new events of a key land next to its old ones
+    _quotes(bus, "MSFT", 30)
+    bus.repartition("quotes.v1", 2, MapPartitioner({"MSFT": 0}))
+    fresh = LocalBus(tmp_path)  # configured default is `hash`, which sends MSFT to 1 of 2
+    assert HashPartitioner()("MSFT", 2) == 1
+    _quotes(fresh, "MSFT", 1, start=30)
+    assert fresh.end_offsets("quotes.v1") == {0: 31, 1: 0}
+
+    # and a roundrobin topic is read across all partitions by the backtest
+    _quotes(fresh, "AAPL", 25)
+    fresh.repartition("quotes.v1", 3, RoundRobinPartitioner())
+    summary = backtest_to_artifacts(LocalBus(tmp_path), tmp_path / "art", "r", "AAPL")
+    pnl = [line.split(",")[0] for line in (tmp_path / "art/pnl.csv").read_text().splitlines()[1:]]
+    assert len(pnl) == 25 and pnl == sorted(pnl)  # time order, not partition order
+    assert summary["orders"] >= 1
+
+    # a batch is dealt out row by row, not one partition per symbol
+    rr = LocalBus(tmp_path / "rr", partitions=3, partitioner=RoundRobinPartitioner())
+    rows = [
+        {"symbol": "AAPL", "ts": f"2025-01-02T14:30:{i:02d}+00:00", "price": 1.0, "volume": 1}
+        for i in range(7)
+    ]
+    rr.publish_batch("quotes.v1", EventBatch.from_rows(QuoteV1, rows))
+    assert sorted(rr.end_offsets("quotes.v1").values()) == [2, 2, 3]
+
+
+def test_legacy_journal_stays_on_sha256(tmp_path: Path) -> None:
+    from gptrader.backtest import backtest_to_artifacts
+
+    old = LocalBus(tmp_path, partitioner=Sha256Partitioner())
+    _quotes(old, "MSFT", 30)
+    (tmp_path / "data/journal/quotes.v1/topic.json").unlink()  # written before topic.json
+    assert Sha256Partitioner()("MSFT", 4) != HashPartitioner()("MSFT", 4)
+
+    bus = LocalBus(tmp_path)
+    _quotes(bus, "MSFT", 1, start=30)
+    assert bus.end_offsets("quotes.v1")[Sha256Partitioner()("MSFT", 4)] == 31
+    meta = json.loads((tmp_path / "data/journal/quotes.v1/topic.json").read_text())
+    assert meta["partitioner"] == "sha256"
+    backtest_to_artifacts(LocalBus(tmp_path), tmp_path / "art", "r", "MSFT")
+    assert (tmp_path / "art/pnl.csv").read_text().count("\n") == 1 + 31
+
+
+def test_partitioner_spec_roundtrip() -> None:
+    m = MapPartitioner({"AAPL": 1}, fallback=Sha256Partitioner())
+    back = from_spec(json.loads(json.dumps(m.spec())))
+    assert isinstance(back, MapPartitioner) and back("AAPL", 2) == 1
+    assert isinstance(back.fallback, Sha256Partitioner)
+    assert isinstance(from_spec(HashPartitioner().spec()), HashPartitioner)
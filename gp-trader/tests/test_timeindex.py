@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import json
+import random
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from gptrader.bus import LocalBus
+from gptrader.cli import app
+from gptrader.synth import MarketSpec, iter_market
+from gptrader.timeindex import INDEX_INTERVAL, NO_TS, TimeIndex, max_micros, ts_micros
+
+START = datetime(2025, 1, 2, 14, 30, tzinfo=UTC)
+
+
+def _at(minutes: float) -> str:
+    return (START + timedelta(minutes=minutes)).isoformat()
+
+
+def _brute(bus: LocalBus, topic: str, ts: str) -> dict[int, int]:
+    """First offset with ts >= target per partition, by scanning everything."""
+    out = {}
+    for p in bus.end_offsets(topic):
+        f = bus.base / "data/journal" / topic / f"partition-{p}.ndjson"
+        lines = f.read_bytes().splitlines()
+        t = ts_micros(ts)
+        out[p] = next(
+            (i for i, x in enumerate(lines) if ts_micros(json.loads(x)["ts"]) >= t), len(lines)
+        )
+    return out
+
+
+@pytest.fixture
+def bus(tmp_path: Path) -> LocalBus:
+    bus = LocalBus(tmp_path, partitions=2)
+    spec = MarketSpec(symbols=["AAPL", "MSFT", "NVDA"], bars=1500, start=START)
+    for chunk in iter_market(spec, batch_bars=700, news=False):
+        bus.publish_batch("quotes.v1", chunk.quotes)
+    return bus
+
+
+def test_ts_parsing() -> None:
+    t = ts_micros("2025-01-02T14:30:00+00:00")
+    assert t == ts_micros("2025-01-02T14:30:00Z") == ts_micros("2025-01-02T16:30:00+02:00")
+    assert t == ts_micros("2025-01-02T14:30:00") == ts_micros(START)
+    assert max_micros([None, 3, "2025-01-02T14:30:00.000001Z", "2025-01-02T14:30:00Z"]) == t + 1
+    assert max_micros([_at(1), _at(0)]) == ts_micros(_at(1)) and max_micros([None]) == NO_TS
+
+
+def test_offsets_for_time_matches_a_full_scan(bus: LocalBus) -> None:
+    f = bus.base / "data/journal/quotes.v1/partition-0.ndjson"
+    ends = bus.end_offsets("quotes.v1")
+    entries = f.with_suffix(".tsidx").read_text().splitlines()
+    assert len(entries) == ends[0] // INDEX_INTERVAL  # sparse: one entry per closed block
+
+    for minutes in (-5, 0, 0.5, 1, 333, 777.25, 1499, 1500, 10_000):
+        ts = _at(minutes)
+        assert bus.offsets_for_time("quotes.v1", ts) == _brute(bus, "quotes.v1", ts), minutes
+    assert bus.offsets_for_time("quotes.v1", _at(10_000)) == ends
+
+    # a fresh bus reloads the index from disk; a deleted index is rebuilt
+    assert LocalBus(bus.base).offsets_for_time("quotes.v1", _at(900)) == _brute(
+        bus, "quotes.v1", _at(900)
+    )
+    f.with_suffix(".tsidx").unlink()
+    assert LocalBus(bus.base).offsets_for_time("quotes.v1", _at(901)) == _brute(
+        bus, "quotes.v1", _at(901)
+    )
+    assert f.with_suffix(".tsidx").read_text().splitlines() == entries
+
+
+def test_out_of_order_timestamps_and_external_writers(tmp_path: Path) -> None:
+    rng = random.Random(3)
+    minutes = [i + rng.uniform(-30, 30) for i in range(3 * INDEX_INTERVAL)]
+    bus = LocalBus(tmp_path, partitions=1)
+    for m in minutes[:2000]:
+        bus.publish("orders.v1", key="A", payload={"ts": _at(m)})
+    other = LocalBus(tmp_path, partitions=1)  # appends behind bus's back
+    for m in minutes[2000:]:
+        other.publish("orders.v1", key="A", payload={"ts": _at(m), "note": "x" * 10})
+    for m in (-100, 0, 17.5, 1500, 2047, 3000, 5000):
+        assert bus.offsets_for_time("orders.v1", _at(m)) == _brute(bus, "orders.v1", _at(m))
+
+    # a truncated journal drops the index entries past its end
+    f = tmp_path / "data/journal/orders.v1/partition-0.ndjson"
+    lines = f.read_bytes().splitlines(keepends=True)
+    f.write_bytes(b"".join(lines[:1500]))
+    idx = TimeIndex(f)
+    assert idx.end_offset == 1500 and len(idx.offsets) == 1
+    assert len(f.with_suffix(".tsidx").read_text().splitlines()) == 1
+    assert LocalBus(tmp_path, partitions=1).offsets_for_time("orders.v1", _at(5000)) == {0: 1500}
+
+
+def test_bad_ts_does_not_break_the_partition(tmp_path: Path) -> None:
+    bus = LocalBus(tmp_path, partitions=1)
+    assert bus.publish("misc.v1", key="k", payload={"ts": "yesterday"}).offset == 0
+    assert bus.publish("misc.v1", key="k", payload={"ts": _at(1)}).offset == 1
+    for i in range(2, 2 * INDEX_INTERVAL):  # close blocks around more bad values
+        ts = [_at(i), "not a time", 42, None][i % 4]
+        bus.publish("misc.v1", key="k", payload={"ts": ts})
+    fresh = LocalBus(tmp_path, partitions=1)  # reloads and re-parses the bad lines
+    assert fresh.publish("misc.v1", key="k", payload={"ts": _at(5000)}).offset == 2048
+    assert fresh.offsets_for_time("misc.v1", _at(1)) == {0: 1}
+    assert fresh.offsets_for_time("misc.v1", _at(1999)) == {0: 2000}
+    assert fresh.offsets_for_time("misc.v1", _at(4000)) == {0: 2048}
+    assert max_micros(["yesterday", "tomorrow!"]) == NO_TS
+    assert max_micros(["2025-99-99T00:00:00+00:00", _at(0)]) == ts_micros(_at(0))
+
+
+def _rewrite(base: Path, start_minutes: int, bars: int) -> None:
+    """What ingest-sample does: delete the journal files and write new ones."""
+    for f in (base / "data/journal/quotes.v1").glob("partition-*.*"):
+        f.unlink()
+    bus = LocalBus(base, partitions=2)
+    spec = MarketSpec(
+        symbols=["AAPL", "MSFT"], bars=bars, start=START + timedelta(minutes=start_minutes)
+    )
+    for chunk in iter_market(spec, batch_bars=700, news=False):
+        bus.publish_batch("quotes.v1", chunk.quotes)
+
+
+def _entries(base: Path) -> list[list[int]]:
+    out = []
+    for f in sorted((base / "data/journal/quotes.v1").glob("*.tsidx")):
+        out.append([int(line.split()[1]) for line in f.read_text().splitlines()])
+    return out
+
+
+def test_long_lived_bus_sees_a_rewritten_journal(tmp_path: Path) -> None:
+    _rewrite(tmp_path, 0, 3000)
+    daemon = LocalBus(tmp_path, partitions=2)  # like `gptrader serve`: outlives the rewrite
+    assert daemon.offsets_for_time("quotes.v1", _at(2500)) == _brute(daemon, "quotes.v1", _at(2500))
+
+    for start, bars in ((1000, 3000), (0, 5000)):  # same size, then a larger file
+        _rewrite(tmp_path, start, bars)
+        for m in (1500, 2500, 4000):
+            want = _brute(daemon, "quotes.v1", _at(m))
+            assert daemon.offsets_for_time("quotes.v1", _at(m)) == want
+            assert LocalBus(tmp_path).offsets_for_time("quotes.v1", _at(m)) == want
+        fresh = [list(range(INDEX_INTERVAL, bars + 1, INDEX_INTERVAL))] * 2
+        assert _entries(tmp_path) == fresh  # no duplicate or out-of-order entries
+
+    # two writers appending to the same partitions never duplicate index entries
+    other = LocalBus(tmp_path, partitions=2)
+    spec = MarketSpec(symbols=["AAPL", "MSFT"], bars=3000, start=START + timedelta(days=9))
+    for k, chunk in enumerate(iter_market(spec, batch_bars=300, news=False)):
+        (daemon if k % 2 else other).publish_batch("quotes.v1", chunk.quotes)
+    assert _entries(tmp_path) == [list(range(INDEX_INTERVAL, 8001, INDEX_INTERVAL))] * 2
+    assert daemon.offsets_for_time("quotes.v1", _at(4999)) == _brute(daemon, "quotes.v1", _at(4999))
+
+
+def test_seek_consumers_and_replays(bus: LocalBus) -> None:
+    since = _at(1200)
+    start = bus.offsets_for_time("quotes.v1", since)
+    envs = list(bus.subscribe(group="g", topic="quotes.v1", from_ts=since))
+    assert len(envs) == sum(e - start[p] for p, e in bus.end_offsets("quotes.v1").items())
+    assert all(e.payload["ts"] >= since for e in envs)
+    assert {e.partition: e.offset for e in reversed(envs)} == start  # first of each partition
+
+    batches = list(bus.read_batches("quotes.v1", from_ts=since, batch_size=500))
+    assert sum(len(b.batch) for b in batches) == len(envs)
+    assert sum(len(b.batch) for b in bus.subscribe_batches(group="g", topic="quotes.v1")) == 4500
+
+    # committed offsets resume mid-block via the index, same events as a full scan
+    bus.commit("g", envs[10])
+    resumed = list(bus.subscribe(group="g", topic="quotes.v1", partitions=[envs[10].partition]))
+    assert resumed[0].offset == envs[10].offset + 1
+    assert resumed[0].payload == envs[11].payload
+
+    assert bus.reset("g", "quotes.v1", to_time=since) == start
+    assert bus.reset("g", "quotes.v1", partition=0) == {0: 0}
+
+
+def test_reset_cli_and_backtest_window(tmp_path: Path, monkeypatch) -> None:
+    import gptrader.cli as cli
+
+    monkeypatch.setattr(cli, "BASE", tmp_path)
+    r = CliRunner().invoke(app, ["ingest-sample", "--bars", "1500", "--start", START.isoformat()])
+    assert r.exit_code == 0, r.output
+
+    r = CliRunner().invoke(app, ["reset", "g", "quotes.v1", "--to-time", _at(1000)])
+    assert r.exit_code == 0, r.output
+    assert "offset=1000" in r.output
+    off = tmp_path / ".runtime/offsets/g"
+    committed = [json.loads(f.read_text())["offset"] for f in off.glob("quotes.v1-*.json")]
+    assert committed and set(committed) == {1000}  # 1000 bars per symbol before the cut
+
+    r = CliRunner().invoke(app, ["reset", "g", "quotes.v1", "--partition", "0"])
+    assert r.exit_code == 0 and "reset to the beginning" in r.output
+    assert CliRunner().invoke(app, ["reset", "g", "quotes.v1", "--to-time", "nope"]).exit_code == 2
+
+    args = ["run-backtest", "--run-id", "recent", "--since", _at(1400)]
+    assert CliRunner().invoke(app, args).exit_code == 0
+    pnl = (tmp_path / "artifacts/run-recent/pnl.csv").read_text().splitlines()
+    assert len(pnl) == 1 + 100 and ts_micros(pnl[1].split(",")[0]) == ts_micros(_at(1400))
+    summary = json.loads((tmp_path / "artifacts/run-recent/summary.json").read_text())
+    assert summary["since"] == _at(1400)
+
+
+def test_backtest_since_drops_bars_behind_the_seek(tmp_path: Path) -> None:
+    from gptrader.backtest import backtest_to_artifacts
+
+    bus = LocalBus(tmp_path, partitions=1)  # every symbol in one partition
+    spec = MarketSpec(symbols=["AAPL", "MSFT", "NVDA"], bars=600, start=START)
+    for chunk in iter_market(spec, batch_bars=200, batch_symbols=1, news=False):
+        bus.publish_batch("quotes.v1", chunk.quotes)  # AAPL 0-199, MSFT 0-199, ...
+
+    since = _at(250)
+    seek = list(bus.subscribe(group="g", topic="quotes.v1", from_ts=since))
+    assert min(e.payload["ts"] for e in seek) < since  # a seek, not a filter
+    for sym in ("AAPL", "NVDA"):
+        backtest_to_artifacts(bus, tmp_path / sym, "r", sym, since=since)
+        pnl = (tmp_path / sym / "pnl.csv").read_text().splitlines()[1:]
+        assert len(pnl) == 350 and ts_micros(pnl[0].split(",")[0]) == ts_micros(since)